@@ -5,14 +5,23 @@ Flask Backend Server with SQLAlchemy ORM
 A robust IoT telemetry ingestion system for refrigerated truck monitoring.
 """
 
-from flask import Flask, request, jsonify, render_template, Response, stream_with_context
+from flask import Flask, request, render_template, Response, stream_with_context
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import insert, update, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import selectinload, joinedload
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from datetime import datetime, timezone
-from typing import Optional
+from typing import Optional, Tuple
+import ciso8601
+import orjson
 import os
-import json
-import queue
+import sqlite3
 import threading
+from collections import deque
+from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
 
 # ============================================================================
 # APPLICATION CONFIGURATION
@@ -23,13 +32,70 @@ app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'vecna-dev-secret-key-ch
 app.config['SQLALCHEMY_DATABASE_URI'] = os.environ.get('DATABASE_URL', 'sqlite:///vecna.db')
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 app.config['SQLALCHEMY_ECHO'] = False  # Set True for SQL debugging
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'insertmanyvalues_page_size': 1000,  # Rows per multi-VALUES INSERT batch
+}
+if app.config['SQLALCHEMY_DATABASE_URI'].startswith(('postgresql://', 'postgresql+psycopg2://')):
+    # psycopg2: batch executemany UPDATE/DELETE with execute_batch as well
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'].update(
+        executemany_mode='values_plus_batch',
+        executemany_batch_page_size=500
+    )
 
 db = SQLAlchemy(app)
 
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Tune SQLite for write-heavy ingest: WAL journal, fewer fsyncs, larger page cache."""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA cache_size=-64000")    # ~64 MB
+    cursor.close()
+
+
 # SSE notification queue for real-time updates
 sse_clients = []  # List of SSE clients
 sse_lock = threading.Lock()  # Thread-safe access
 
+
+class SSEClient:
+    """
+    Per-client SSE buffer. Holds only the most recent events: when a slow
+    client falls behind, the oldest events are dropped instead of queueing
+    without bound.
+    """
+    
+    def __init__(self, maxlen: int = 10):
+        self.messages = deque(maxlen=maxlen)
+        self.condition = threading.Condition()
+    
+    def push(self, message: str):
+        with self.condition:
+            self.messages.append(message)
+            self.condition.notify()
+    
+    def pop(self, timeout: float) -> Optional[str]:
+        """Return the oldest buffered message, or None if none arrives within timeout."""
+        with self.condition:
+            if not self.messages:
+                self.condition.wait(timeout)
+            return self.messages.popleft() if self.messages else None
+
+# Optional Redis pub/sub for SSE fan-out across multiple worker processes.
+# Without REDIS_URL, events only reach clients connected to the same process.
+REDIS_URL = os.environ.get('REDIS_URL')
+SSE_CHANNEL = 'vecna:telemetry'
+_redis_client = None
+
+# Single background thread that builds and sends SSE payloads after ingest
+broadcaster = ThreadPoolExecutor(max_workers=1, thread_name_prefix='sse-broadcast')
+
 # ============================================================================
 # THRESHOLD CONSTANTS
 # ============================================================================
@@ -40,11 +106,109 @@ BATTERY_LOW_THRESHOLD = 20       # % - Below this triggers low battery alert
 BATTERY_CRITICAL_THRESHOLD = 10  # % - Critical battery level
 SIGNAL_WEAK_THRESHOLD = -85      # dBm - Weak signal strength
 
+MAX_BATCH_FRAMES = 1000          # Frames accepted per batch ingest request
+
+
+# ============================================================================
+# RESPONSE DTOs
+# ============================================================================
+# Slotted dataclasses returned by the models' to_dto(). orjson serializes
+# dataclasses natively in C, in field order, so API payloads keep the
+# same shape as plain dicts without building one per row.
+
+@dataclass(slots=True)
+class TruckDTO:
+    id: int
+    gateway_id: str
+    plate_number: Optional[str]
+    driver_name: Optional[str]
+    truck_model: Optional[str]
+    refrigeration_unit: Optional[str]
+    registered_at: Optional[datetime]
+    is_active: Optional[bool]
+
+
+@dataclass(slots=True)
+class TripDTO:
+    id: int
+    trip_id: str
+    truck_id: int
+    origin: Optional[str]
+    destination: Optional[str]
+    started_at: Optional[datetime]
+    ended_at: Optional[datetime]
+    status: Optional[str]
+    total_frames: Optional[int]
+    alert_count: Optional[int]
+
+
+@dataclass(slots=True)
+class LocationDTO:
+    lat: Optional[float]
+    lng: Optional[float]
+    speed_kmh: Optional[float]
+    heading_deg: Optional[float]
+    satellites: Optional[int]
+
+
+@dataclass(slots=True)
+class GatewayHealthDTO:
+    battery_mv: Optional[int]
+    signal_strength_dbm: Optional[int]
+    uptime_seconds: Optional[int]
+    cpu_temp_c: Optional[float]
+
+
+@dataclass(slots=True)
+class FrameDTO:
+    id: int
+    trip_id: int
+    timestamp: datetime
+    received_at: Optional[datetime]
+    location: LocationDTO
+    gateway_health: GatewayHealthDTO
+    has_alerts: Optional[bool]
+    sensor_count: Optional[int]
+
+
+@dataclass(slots=True)
+class SensorReadingDTO:
+    id: int
+    frame_id: int
+    node_id: str
+    product_type: Optional[str]
+    temp_c: float
+    battery_pct: Optional[int]
+    link_quality: Optional[int]
+    status: Optional[str]
+    temp_alert: Optional[bool]
+    battery_alert: Optional[bool]
+
+
+@dataclass(slots=True)
+class AlertDTO:
+    id: int
+    frame_id: int
+    created_at: Optional[datetime]
+    alert_type: str
+    severity: Optional[str]
+    node_id: Optional[str]
+    message: str
+    value: Optional[float]
+    threshold: Optional[float]
+    is_resolved: Optional[bool]
+    resolved_at: Optional[datetime]
+
 
 # ============================================================================
 # DATABASE MODELS - NORMALIZED SCHEMA
 # ============================================================================
 
+# Serialized trucks keyed by id -> (updated_at, TruckDTO); see Truck.to_dto
+TRUCK_DTO_CACHE_SIZE = 1024
+_truck_dto_cache = {}
+
+
 class Truck(db.Model):
     """
     Static information about registered trucks in the fleet.
@@ -59,22 +223,33 @@ class Truck(db.Model):
     truck_model = db.Column(db.String(100), nullable=True)
     refrigeration_unit = db.Column(db.String(100), nullable=True)
     registered_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     
     # Relationships
     trips = db.relationship('Trip', backref='truck', lazy='dynamic')
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'gateway_id': self.gateway_id,
-            'plate_number': self.plate_number,
-            'driver_name': self.driver_name,
-            'truck_model': self.truck_model,
-            'refrigeration_unit': self.refrigeration_unit,
-            'registered_at': self.registered_at.isoformat() if self.registered_at else None,
-            'is_active': self.is_active
-        }
+    def to_dto(self) -> TruckDTO:
+        # Truck rows rarely change; reuse the DTO until updated_at moves
+        version = self.updated_at or self.registered_at
+        cached = _truck_dto_cache.get(self.id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        
+        data = TruckDTO(
+            id=self.id,
+            gateway_id=self.gateway_id,
+            plate_number=self.plate_number,
+            driver_name=self.driver_name,
+            truck_model=self.truck_model,
+            refrigeration_unit=self.refrigeration_unit,
+            registered_at=self.registered_at,
+            is_active=self.is_active
+        )
+        if len(_truck_dto_cache) >= TRUCK_DTO_CACHE_SIZE:
+            _truck_dto_cache.clear()
+        _truck_dto_cache[self.id] = (version, data)
+        return data
 
 
 class Trip(db.Model):
@@ -98,23 +273,36 @@ class Trip(db.Model):
     # Computed stats (updated on ingestion)
     total_frames = db.Column(db.Integer, default=0)
     alert_count = db.Column(db.Integer, default=0)
+    latest_frame_id = db.Column(
+        db.Integer,
+        # trips <-> telemetry_frames reference each other; add this FK after both tables exist
+        db.ForeignKey('telemetry_frames.id', use_alter=True, name='fk_trips_latest_frame_id'),
+        nullable=True
+    )
     
     # Relationships
-    telemetry_frames = db.relationship('TelemetryFrame', backref='trip', lazy='dynamic')
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'trip_id': self.trip_id,
-            'truck_id': self.truck_id,
-            'origin': self.origin,
-            'destination': self.destination,
-            'started_at': self.started_at.isoformat() if self.started_at else None,
-            'ended_at': self.ended_at.isoformat() if self.ended_at else None,
-            'status': self.status,
-            'total_frames': self.total_frames,
-            'alert_count': self.alert_count
-        }
+    telemetry_frames = db.relationship('TelemetryFrame', backref='trip', lazy='dynamic',
+                                       foreign_keys='TelemetryFrame.trip_id')
+    latest_frame = db.relationship('TelemetryFrame', foreign_keys=[latest_frame_id],
+                                   post_update=True)
+    
+    __table_args__ = (
+        db.Index('ix_trips_status_started_at', status, started_at.desc()),
+    )
+    
+    def to_dto(self) -> TripDTO:
+        return TripDTO(
+            id=self.id,
+            trip_id=self.trip_id,
+            truck_id=self.truck_id,
+            origin=self.origin,
+            destination=self.destination,
+            started_at=self.started_at,
+            ended_at=self.ended_at,
+            status=self.status,
+            total_frames=self.total_frames,
+            alert_count=self.alert_count
+        )
 
 
 class TelemetryFrame(db.Model):
@@ -125,7 +313,7 @@ class TelemetryFrame(db.Model):
     __tablename__ = 'telemetry_frames'
     
     id = db.Column(db.Integer, primary_key=True)
-    trip_id = db.Column(db.Integer, db.ForeignKey('trips.id'), nullable=False, index=True)
+    trip_id = db.Column(db.Integer, db.ForeignKey('trips.id'), nullable=False)
     timestamp = db.Column(db.DateTime, nullable=False, index=True)
     received_at = db.Column(db.DateTime, default=datetime.utcnow)
     
@@ -144,33 +332,41 @@ class TelemetryFrame(db.Model):
     
     # Frame status
     has_alerts = db.Column(db.Boolean, default=False)
+    sensor_count = db.Column(db.Integer, default=0)  # Denormalized at ingest time
     
     # Relationships
-    sensor_readings = db.relationship('SensorReading', backref='frame', lazy='dynamic')
-    alerts = db.relationship('SystemAlert', backref='frame', lazy='dynamic')
-    
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'trip_id': self.trip_id,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
-            'received_at': self.received_at.isoformat() if self.received_at else None,
-            'location': {
-                'lat': self.latitude,
-                'lng': self.longitude,
-                'speed_kmh': self.speed_kmh,
-                'heading_deg': self.heading_deg,
-                'satellites': self.satellites
-            },
-            'gateway_health': {
-                'battery_mv': self.battery_mv,
-                'signal_strength_dbm': self.signal_strength_dbm,
-                'uptime_seconds': self.uptime_seconds,
-                'cpu_temp_c': self.cpu_temp_c
-            },
-            'has_alerts': self.has_alerts,
-            'sensor_count': self.sensor_readings.count()
-        }
+    sensor_readings = db.relationship('SensorReading', backref='frame', lazy='select',
+                                      order_by='SensorReading.id')
+    alerts = db.relationship('SystemAlert', backref='frame', lazy='select',
+                             order_by='SystemAlert.id')
+    
+    __table_args__ = (
+        # Serves "latest frame for trip" with a single index scan
+        db.Index('ix_telemetry_frames_trip_id_timestamp', trip_id, timestamp.desc()),
+    )
+    
+    def to_dto(self) -> FrameDTO:
+        return FrameDTO(
+            id=self.id,
+            trip_id=self.trip_id,
+            timestamp=self.timestamp,
+            received_at=self.received_at,
+            location=LocationDTO(
+                lat=self.latitude,
+                lng=self.longitude,
+                speed_kmh=self.speed_kmh,
+                heading_deg=self.heading_deg,
+                satellites=self.satellites
+            ),
+            gateway_health=GatewayHealthDTO(
+                battery_mv=self.battery_mv,
+                signal_strength_dbm=self.signal_strength_dbm,
+                uptime_seconds=self.uptime_seconds,
+                cpu_temp_c=self.cpu_temp_c
+            ),
+            has_alerts=self.has_alerts,
+            sensor_count=self.sensor_count
+        )
 
 
 class SensorReading(db.Model):
@@ -197,19 +393,19 @@ class SensorReading(db.Model):
     temp_alert = db.Column(db.Boolean, default=False)
     battery_alert = db.Column(db.Boolean, default=False)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'frame_id': self.frame_id,
-            'node_id': self.node_id,
-            'product_type': self.product_type,
-            'temp_c': self.temp_c,
-            'battery_pct': self.battery_pct,
-            'link_quality': self.link_quality,
-            'status': self.status,
-            'temp_alert': self.temp_alert,
-            'battery_alert': self.battery_alert
-        }
+    def to_dto(self) -> SensorReadingDTO:
+        return SensorReadingDTO(
+            id=self.id,
+            frame_id=self.frame_id,
+            node_id=self.node_id,
+            product_type=self.product_type,
+            temp_c=self.temp_c,
+            battery_pct=self.battery_pct,
+            link_quality=self.link_quality,
+            status=self.status,
+            temp_alert=self.temp_alert,
+            battery_alert=self.battery_alert
+        )
 
 
 class SystemAlert(db.Model):
@@ -220,7 +416,7 @@ class SystemAlert(db.Model):
     __tablename__ = 'system_alerts'
     
     id = db.Column(db.Integer, primary_key=True)
-    frame_id = db.Column(db.Integer, db.ForeignKey('telemetry_frames.id'), nullable=False, index=True)
+    frame_id = db.Column(db.Integer, db.ForeignKey('telemetry_frames.id'), nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Alert details
@@ -235,62 +431,112 @@ class SystemAlert(db.Model):
     is_resolved = db.Column(db.Boolean, default=False)
     resolved_at = db.Column(db.DateTime, nullable=True)
     
-    def to_dict(self):
-        return {
-            'id': self.id,
-            'frame_id': self.frame_id,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'alert_type': self.alert_type,
-            'severity': self.severity,
-            'node_id': self.node_id,
-            'message': self.message,
-            'value': self.value,
-            'threshold': self.threshold,
-            'is_resolved': self.is_resolved,
-            'resolved_at': self.resolved_at.isoformat() if self.resolved_at else None
-        }
+    __table_args__ = (
+        db.Index('ix_system_alerts_frame_id_is_resolved', frame_id, is_resolved),
+        # Partial index: /api/v1/alerts only ever scans unresolved alerts
+        db.Index('ix_alerts_unresolved_created', created_at.desc(),
+                 postgresql_where=(is_resolved == db.false()),
+                 sqlite_where=(is_resolved == db.false())),
+    )
+    
+    def to_dto(self) -> AlertDTO:
+        return AlertDTO(
+            id=self.id,
+            frame_id=self.frame_id,
+            created_at=self.created_at,
+            alert_type=self.alert_type,
+            severity=self.severity,
+            node_id=self.node_id,
+            message=self.message,
+            value=self.value,
+            threshold=self.threshold,
+            is_resolved=self.is_resolved,
+            resolved_at=self.resolved_at
+        )
 
 
 # ============================================================================
 # HELPER FUNCTIONS
 # ============================================================================
 
+# Naive datetimes in the database are UTC
+ORJSON_OPTIONS = orjson.OPT_NAIVE_UTC
+
+
+def ojsonify(payload) -> Response:
+    """Serialize payload to a JSON response with orjson (datetimes encoded natively)."""
+    return Response(orjson.dumps(payload, option=ORJSON_OPTIONS), mimetype='application/json')
+
+
 def parse_iso_timestamp(timestamp_str: str) -> Optional[datetime]:
     """Parse ISO 8601 timestamp string to datetime object."""
     if not timestamp_str:
         return None
     try:
-        # Handle 'Z' suffix for UTC
-        if timestamp_str.endswith('Z'):
-            timestamp_str = timestamp_str[:-1] + '+00:00'
-        return datetime.fromisoformat(timestamp_str)
+        # C parser; handles the 'Z' UTC suffix natively
+        timestamp = ciso8601.parse_datetime(timestamp_str)
     except ValueError:
         return None
+    
+    # Columns hold naive UTC; converting offset timestamps also keeps
+    # naive and offset frames in one batch comparable
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def upsert_insert(model):
+    """INSERT construct supporting ON CONFLICT for the active database (PostgreSQL or SQLite)."""
+    if db.engine.dialect.name == 'postgresql':
+        return pg_insert(model)
+    return sqlite_insert(model)
 
 
 def get_or_create_truck(gateway_id: str) -> Truck:
-    """Get existing truck or create a new one."""
-    truck = Truck.query.filter_by(gateway_id=gateway_id).first()
-    if not truck:
-        truck = Truck(gateway_id=gateway_id)
-        db.session.add(truck)
-        db.session.flush()  # Get the ID without committing
-    return truck
+    """
+    Get existing truck or create a new one.
+    A single atomic upsert, safe against concurrent first-sight ingests.
+    """
+    stmt = upsert_insert(Truck).values(gateway_id=gateway_id)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['gateway_id'],
+        set_={'gateway_id': stmt.excluded.gateway_id}
+    ).returning(Truck)
+    return db.session.scalars(stmt, execution_options={'populate_existing': True}).one()
 
 
 def get_or_create_trip(trip_id: str, truck: Truck) -> Trip:
-    """Get existing trip or create a new one."""
-    trip = Trip.query.filter_by(trip_id=trip_id).first()
-    if not trip:
-        trip = Trip(
-            trip_id=trip_id,
-            truck_id=truck.id,
-            started_at=datetime.utcnow(),
-            status='ACTIVE'
-        )
-        db.session.add(trip)
-        db.session.flush()
-    return trip
+    """
+    Get existing trip or create a new one.
+    A single atomic upsert, safe against concurrent first-sight ingests.
+    """
+    stmt = upsert_insert(Trip).values(
+        trip_id=trip_id,
+        truck_id=truck.id,
+        started_at=datetime.utcnow(),
+        status='ACTIVE'
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=['trip_id'],
+        set_={'trip_id': stmt.excluded.trip_id}
+    ).returning(Trip)
+    return db.session.scalars(stmt, execution_options={'populate_existing': True}).one()
+
+
+def resolve_truck_and_trip(gateway_id: str, trip_id: str) -> Tuple[Truck, Trip]:
+    """
+    Look up the truck and trip for an ingest in a single SELECT.
+    Falls back to get-or-create only when either one is missing.
+    """
+    row = db.session.query(Truck, Trip)\
+        .outerjoin(Trip, Trip.trip_id == trip_id)\
+        .filter(Truck.gateway_id == gateway_id).first()
+    
+    if row and row.Trip is not None:
+        return row.Truck, row.Trip
+    
+    truck = row.Truck if row else get_or_create_truck(gateway_id)
+    return truck, get_or_create_trip(trip_id, truck)
 
 
 def compute_sensor_status(temp_c: float, battery_pct: int) -> str:
@@ -302,70 +548,218 @@ def compute_sensor_status(temp_c: float, battery_pct: int) -> str:
     return 'NOMINAL'
 
 
-def create_alerts_for_reading(frame: TelemetryFrame, reading: SensorReading) -> list:
-    """Generate alerts for a sensor reading if thresholds are exceeded."""
+def build_sensor_reading(sensor_data: dict) -> dict:
+    """Build the column values for a sensor reading row (frame_id is set on insert)."""
+    temp_c = sensor_data['temp_c']
+    battery_pct = sensor_data.get('battery_pct')
+    return {
+        'node_id': sensor_data['node_id'],
+        'product_type': sensor_data.get('product_type'),
+        'temp_c': temp_c,
+        'battery_pct': battery_pct,
+        'link_quality': sensor_data.get('link_quality'),
+        'status': compute_sensor_status(temp_c, battery_pct or 100),
+        'temp_alert': temp_c >= TEMP_WARNING_THRESHOLD,
+        'battery_alert': battery_pct is not None and battery_pct < BATTERY_LOW_THRESHOLD
+    }
+
+
+def create_alerts_for_reading(reading: dict) -> list:
+    """Generate alert rows for a sensor reading if thresholds are exceeded (frame_id is set on insert)."""
     alerts = []
+    node_id = reading['node_id']
+    temp_c = reading['temp_c']
+    battery_pct = reading['battery_pct']
+    link_quality = reading['link_quality']
     
     # Temperature Alert
-    if reading.temp_c >= TEMP_WARNING_THRESHOLD:
-        severity = 'CRITICAL' if reading.temp_c >= TEMP_CRITICAL_THRESHOLD else 'WARNING'
-        alert = SystemAlert(
-            frame_id=frame.id,
-            alert_type='TEMP_HIGH',
-            severity=severity,
-            node_id=reading.node_id,
-            message=f"Temperature {reading.temp_c}°C exceeds threshold for {reading.product_type or 'cargo'}",
-            value=reading.temp_c,
-            threshold=TEMP_WARNING_THRESHOLD
-        )
-        alerts.append(alert)
-        reading.temp_alert = True
+    if temp_c >= TEMP_WARNING_THRESHOLD:
+        alerts.append({
+            'alert_type': 'TEMP_HIGH',
+            'severity': 'CRITICAL' if temp_c >= TEMP_CRITICAL_THRESHOLD else 'WARNING',
+            'node_id': node_id,
+            'message': f"Temperature {temp_c}°C exceeds threshold for {reading['product_type'] or 'cargo'}",
+            'value': temp_c,
+            'threshold': TEMP_WARNING_THRESHOLD
+        })
     
     # Battery Alert
-    if reading.battery_pct is not None and reading.battery_pct < BATTERY_LOW_THRESHOLD:
-        severity = 'CRITICAL' if reading.battery_pct < BATTERY_CRITICAL_THRESHOLD else 'WARNING'
-        alert = SystemAlert(
-            frame_id=frame.id,
-            alert_type='BATTERY_LOW',
-            severity=severity,
-            node_id=reading.node_id,
-            message=f"Sensor {reading.node_id} battery at {reading.battery_pct}%",
-            value=reading.battery_pct,
-            threshold=BATTERY_LOW_THRESHOLD
-        )
-        alerts.append(alert)
-        reading.battery_alert = True
+    if battery_pct is not None and battery_pct < BATTERY_LOW_THRESHOLD:
+        alerts.append({
+            'alert_type': 'BATTERY_LOW',
+            'severity': 'CRITICAL' if battery_pct < BATTERY_CRITICAL_THRESHOLD else 'WARNING',
+            'node_id': node_id,
+            'message': f"Sensor {node_id} battery at {battery_pct}%",
+            'value': battery_pct,
+            'threshold': BATTERY_LOW_THRESHOLD
+        })
     
     # Signal Quality Alert
-    if reading.link_quality is not None and reading.link_quality < SIGNAL_WEAK_THRESHOLD:
-        alert = SystemAlert(
-            frame_id=frame.id,
-            alert_type='SIGNAL_WEAK',
-            severity='INFO',
-            node_id=reading.node_id,
-            message=f"Sensor {reading.node_id} has weak BLE signal ({reading.link_quality} dBm)",
-            value=reading.link_quality,
-            threshold=SIGNAL_WEAK_THRESHOLD
-        )
-        alerts.append(alert)
+    if link_quality is not None and link_quality < SIGNAL_WEAK_THRESHOLD:
+        alerts.append({
+            'alert_type': 'SIGNAL_WEAK',
+            'severity': 'INFO',
+            'node_id': node_id,
+            'message': f"Sensor {node_id} has weak BLE signal ({link_quality} dBm)",
+            'value': link_quality,
+            'threshold': SIGNAL_WEAK_THRESHOLD
+        })
     
     return alerts
 
 
+def validate_telemetry_payload(data) -> Tuple[Optional[datetime], Optional[str]]:
+    """Check required fields and parse the timestamp. Returns (timestamp, error message)."""
+    if not isinstance(data, dict):
+        return None, 'Telemetry frame must be a JSON object'
+    
+    required_fields = ['gateway_id', 'trip_id', 'timestamp']
+    missing = [f for f in required_fields if f not in data]
+    if missing:
+        return None, f'Missing required fields: {", ".join(missing)}'
+    
+    timestamp = parse_iso_timestamp(data['timestamp'])
+    if not timestamp:
+        return None, 'Invalid timestamp format. Use ISO 8601 (e.g., 2026-01-16T14:30:00Z)'
+    
+    return timestamp, None
+
+
+def build_frame_rows(data: dict, trip: Trip, timestamp: datetime) -> Tuple[dict, list, list]:
+    """
+    Build the column values for a telemetry frame and its sensor reading and
+    alert rows (frame_id is set on insert). Readings and alerts are built
+    first so the frame row carries its final has_alerts/sensor_count.
+    Only sensors carrying the required fields are stored.
+    """
+    readings = []
+    alerts = []
+    for sensor_data in data.get('cargo_sensors', []):
+        if 'node_id' not in sensor_data or 'temp_c' not in sensor_data:
+            continue
+        
+        reading = build_sensor_reading(sensor_data)
+        readings.append(reading)
+        alerts.extend(create_alerts_for_reading(reading))
+    
+    location = data.get('location', {})
+    gateway_health = data.get('gateway_health', {})
+    frame = {
+        'trip_id': trip.id,
+        'timestamp': timestamp,
+        # Location
+        'latitude': location.get('lat'),
+        'longitude': location.get('lng'),
+        'speed_kmh': location.get('speed_kmh'),
+        'heading_deg': location.get('heading_deg'),
+        'satellites': location.get('satellites'),
+        # Gateway health
+        'battery_mv': gateway_health.get('battery_mv'),
+        'signal_strength_dbm': gateway_health.get('signal_strength_dbm'),
+        'uptime_seconds': gateway_health.get('uptime_seconds'),
+        'cpu_temp_c': gateway_health.get('cpu_temp_c'),
+        'has_alerts': bool(alerts),
+        'sensor_count': len(readings)
+    }
+    return frame, readings, alerts
+
+
+def latest_frame_expr(frame_id: int, timestamp: datetime):
+    """
+    SQL expression for Trip.latest_frame_id after storing a frame: the new
+    frame wins unless the current latest frame is newer (e.g. a replayed
+    offline frame), so the pointer never moves backwards in time.
+    """
+    current_ts = db.select(TelemetryFrame.timestamp)\
+        .where(TelemetryFrame.id == Trip.latest_frame_id).scalar_subquery()
+    return db.case(
+        (db.or_(Trip.latest_frame_id.is_(None), current_ts <= timestamp), frame_id),
+        else_=Trip.latest_frame_id
+    )
+
+
+def update_trip_stats(trip_pk: int, frames: int, alerts: int, latest_frame_id: int, latest_timestamp: datetime):
+    """
+    Add to a trip's frame/alert counters and advance its latest frame in one
+    UPDATE. Increments happen in SQL, so concurrent ingests for the same trip
+    cannot overwrite each other's counts.
+    """
+    db.session.execute(
+        update(Trip).where(Trip.id == trip_pk).values(
+            total_frames=Trip.total_frames + frames,
+            alert_count=Trip.alert_count + alerts,
+            latest_frame_id=latest_frame_expr(latest_frame_id, latest_timestamp)
+        ).execution_options(synchronize_session=False)
+    )
+
+
+def insert_frame_children(readings: list, alerts: list):
+    """
+    Bulk insert sensor readings and alerts: one multi-VALUES statement per
+    table instead of a row each. render_nulls keeps rows with None values
+    in the same batch.
+    """
+    if readings:
+        db.session.execute(
+            insert(SensorReading).execution_options(render_nulls=True),
+            readings
+        )
+    
+    if alerts:
+        db.session.execute(
+            insert(SystemAlert).execution_options(render_nulls=True),
+            alerts
+        )
+
+
+def get_redis():
+    """Return the shared Redis client (only used when REDIS_URL is set)."""
+    global _redis_client
+    if _redis_client is None:
+        import redis
+        _redis_client = redis.Redis.from_url(REDIS_URL)
+    return _redis_client
+
+
 def notify_sse_clients(data):
     """Send data to all connected SSE clients."""
+    # Encode once for every subscriber
+    message = orjson.dumps(data, option=ORJSON_OPTIONS).decode()
+    
+    if REDIS_URL:
+        try:
+            get_redis().publish(SSE_CHANNEL, message)
+        except Exception as e:
+            # Telemetry is already committed; a broadcast failure must not fail the ingest
+            app.logger.warning(f"SSE publish failed: {str(e)}")
+        return
+    
     with sse_lock:
-        # Remove disconnected clients
-        disconnected = []
-        for i, client_queue in enumerate(sse_clients):
-            try:
-                client_queue.put_nowait(data)
-            except queue.Full:
-                disconnected.append(i)
-        
-        # Remove disconnected clients
-        for i in reversed(disconnected):
-            sse_clients.pop(i)
+        for client in sse_clients:
+            client.push(message)
+
+
+def broadcast_frame(frame_id: int):
+    """Load a committed frame with its readings, alerts, trip and truck, then notify SSE clients."""
+    try:
+        with app.app_context():
+            frame = db.session.get(TelemetryFrame, frame_id, options=[
+                selectinload(TelemetryFrame.sensor_readings),
+                selectinload(TelemetryFrame.alerts),
+                joinedload(TelemetryFrame.trip).joinedload(Trip.truck)
+            ])
+            if frame is None:
+                return
+            
+            notify_sse_clients({
+                'frame': frame.to_dto(),
+                'sensors': [r.to_dto() for r in frame.sensor_readings],
+                'alerts': [a.to_dto() for a in frame.alerts],
+                'truck': frame.trip.truck.to_dto(),
+                'trip': frame.trip.to_dto()
+            })
+    except Exception as e:
+        app.logger.error(f"SSE broadcast error: {str(e)}")
 
 
 # ============================================================================
@@ -387,121 +781,177 @@ def ingest_telemetry():
         data = request.get_json()
         
         if not data:
-            return jsonify({
+            return ojsonify({
                 'success': False,
                 'error': 'No JSON payload received'
             }), 400
         
-        # Validate required fields
-        required_fields = ['gateway_id', 'trip_id', 'timestamp']
-        missing = [f for f in required_fields if f not in data]
-        if missing:
-            return jsonify({
+        timestamp, error = validate_telemetry_payload(data)
+        if error:
+            return ojsonify({
                 'success': False,
-                'error': f'Missing required fields: {", ".join(missing)}'
+                'error': error
             }), 400
         
-        # Parse timestamp
-        timestamp = parse_iso_timestamp(data['timestamp'])
-        if not timestamp:
-            return jsonify({
-                'success': False,
-                'error': 'Invalid timestamp format. Use ISO 8601 (e.g., 2026-01-16T14:30:00Z)'
-            }), 400
-        
-        # Get or create truck and trip
-        truck = get_or_create_truck(data['gateway_id'])
-        trip = get_or_create_trip(data['trip_id'], truck)
-        
-        # Extract location data
-        location = data.get('location', {})
-        gateway_health = data.get('gateway_health', {})
+        # Resolve truck and trip (one SELECT once both exist)
+        truck, trip = resolve_truck_and_trip(data['gateway_id'], data['trip_id'])
         
         # Create telemetry frame
-        frame = TelemetryFrame(
-            trip_id=trip.id,
-            timestamp=timestamp,
-            # Location
-            latitude=location.get('lat'),
-            longitude=location.get('lng'),
-            speed_kmh=location.get('speed_kmh'),
-            heading_deg=location.get('heading_deg'),
-            satellites=location.get('satellites'),
-            # Gateway health
-            battery_mv=gateway_health.get('battery_mv'),
-            signal_strength_dbm=gateway_health.get('signal_strength_dbm'),
-            uptime_seconds=gateway_health.get('uptime_seconds'),
-            cpu_temp_c=gateway_health.get('cpu_temp_c')
-        )
+        frame_row, readings_payload, alerts_payload = build_frame_rows(data, trip, timestamp)
+        frame = TelemetryFrame(**frame_row)
         db.session.add(frame)
         db.session.flush()  # Get frame ID
         
-        # Process cargo sensors
-        all_alerts = []
-        cargo_sensors = data.get('cargo_sensors', [])
-        
-        for sensor_data in cargo_sensors:
-            # Validate required sensor fields
-            if 'node_id' not in sensor_data or 'temp_c' not in sensor_data:
-                continue
-            
-            battery_pct = sensor_data.get('battery_pct')
-            
-            # Create sensor reading
-            reading = SensorReading(
-                frame_id=frame.id,
-                node_id=sensor_data['node_id'],
-                product_type=sensor_data.get('product_type'),
-                temp_c=sensor_data['temp_c'],
-                battery_pct=battery_pct,
-                link_quality=sensor_data.get('link_quality'),
-                status=compute_sensor_status(sensor_data['temp_c'], battery_pct or 100)
-            )
-            db.session.add(reading)
-            
-            # Generate alerts
-            alerts = create_alerts_for_reading(frame, reading)
-            all_alerts.extend(alerts)
-        
-        # Add all alerts to session
-        for alert in all_alerts:
-            db.session.add(alert)
+        for row in readings_payload:
+            row['frame_id'] = frame.id
+        for row in alerts_payload:
+            row['frame_id'] = frame.id
+        insert_frame_children(readings_payload, alerts_payload)
         
-        # Update frame and trip stats
-        if all_alerts:
-            frame.has_alerts = True
-            trip.alert_count += len(all_alerts)
+        # Update trip stats
+        update_trip_stats(trip.id, 1, len(alerts_payload), frame.id, timestamp)
         
-        trip.total_frames += 1
+        # Captured before commit, which expires the ORM objects
+        frame_id = frame.id
+        response_data = {
+            'frame_id': frame_id,
+            'trip_id': trip.trip_id,
+            'sensors_processed': len(data.get('cargo_sensors', [])),
+            'alerts_generated': len(alerts_payload)
+        }
         
         # Commit all changes
         db.session.commit()
         
-        # Notify SSE clients with new data
-        sse_data = {
-            'frame': frame.to_dict(),
-            'sensors': [SensorReading.query.get(r.id).to_dict() for r in db.session.query(SensorReading).filter_by(frame_id=frame.id).all()],
-            'alerts': [a.to_dict() for a in all_alerts],
-            'truck': truck.to_dict(),
-            'trip': trip.to_dict()
-        }
-        notify_sse_clients(sse_data)
+        # Notify SSE clients with new data, off the request thread
+        if REDIS_URL or sse_clients:
+            broadcaster.submit(broadcast_frame, frame_id)
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': 'Telemetry ingested successfully',
-            'data': {
-                'frame_id': frame.id,
-                'trip_id': trip.trip_id,
-                'sensors_processed': len(cargo_sensors),
-                'alerts_generated': len(all_alerts)
-            }
+            'data': response_data
         }), 201
         
     except Exception as e:
         db.session.rollback()
         app.logger.error(f"Telemetry ingestion error: {str(e)}")
-        return jsonify({
+        return ojsonify({
+            'success': False,
+            'error': f'Server error: {str(e)}'
+        }), 500
+
+
+@app.route('/api/v1/telemetry/batch', methods=['POST'])
+def ingest_telemetry_batch():
+    """
+    Batch telemetry ingestion for gateways replaying frames buffered offline.
+    Accepts {"frames": [...]} where each frame matches the single-frame payload.
+    All frames are stored in one transaction; one invalid frame rejects the batch.
+    
+    Returns:
+        201: Successfully ingested
+        400: Invalid payload
+        500: Server error
+    """
+    try:
+        data = request.get_json()
+        frames = data.get('frames') if isinstance(data, dict) else None
+        
+        if not isinstance(frames, list) or not frames:
+            return ojsonify({
+                'success': False,
+                'error': 'Expected JSON payload with a non-empty "frames" list'
+            }), 400
+        
+        if len(frames) > MAX_BATCH_FRAMES:
+            return ojsonify({
+                'success': False,
+                'error': f'Batch too large: {len(frames)} frames (max {MAX_BATCH_FRAMES})'
+            }), 400
+        
+        # Validate everything before touching the database
+        timestamps = []
+        for index, frame_data in enumerate(frames):
+            timestamp, error = validate_telemetry_payload(frame_data)
+            if error:
+                return ojsonify({
+                    'success': False,
+                    'error': f'Frame {index}: {error}'
+                }), 400
+            timestamps.append(timestamp)
+        
+        # Resolve each distinct truck/trip pair once
+        trips = {}
+        frame_rows = []
+        children = []
+        for frame_data, timestamp in zip(frames, timestamps):
+            key = (frame_data['gateway_id'], frame_data['trip_id'])
+            if key not in trips:
+                truck, trips[key] = resolve_truck_and_trip(*key)
+            
+            frame_row, readings, alerts = build_frame_rows(frame_data, trips[key], timestamp)
+            frame_rows.append(frame_row)
+            children.append((readings, alerts))
+        
+        # One executemany for the frames; RETURNING ids in parameter order
+        # maps each frame to its sensor readings and alerts
+        frame_ids = db.session.scalars(
+            insert(TelemetryFrame).returning(
+                TelemetryFrame.id, sort_by_parameter_order=True
+            ).execution_options(render_nulls=True),
+            frame_rows
+        ).all()
+        
+        readings_payload = []
+        alerts_payload = []
+        for frame_id, (readings, alerts) in zip(frame_ids, children):
+            for row in readings:
+                row['frame_id'] = frame_id
+            for row in alerts:
+                row['frame_id'] = frame_id
+            readings_payload.extend(readings)
+            alerts_payload.extend(alerts)
+        insert_frame_children(readings_payload, alerts_payload)
+        
+        # Per trip: frame count, alert count and newest frame (also used for SSE)
+        stats = {}
+        for frame_id, frame_row, (_, alerts) in zip(frame_ids, frame_rows, children):
+            trip_pk = frame_row['trip_id']
+            frames_count, alerts_count, latest_id, latest_ts = stats.get(trip_pk, (0, 0, None, None))
+            if latest_ts is None or frame_row['timestamp'] >= latest_ts:
+                latest_id, latest_ts = frame_id, frame_row['timestamp']
+            stats[trip_pk] = (frames_count + 1, alerts_count + len(alerts), latest_id, latest_ts)
+        
+        for trip_pk, trip_stats in stats.items():
+            update_trip_stats(trip_pk, *trip_stats)
+        
+        # Captured before commit, which expires the ORM objects
+        response_data = {
+            'frame_ids': frame_ids,
+            'frames_ingested': len(frame_ids),
+            'sensors_processed': sum(len(f.get('cargo_sensors', [])) for f in frames),
+            'alerts_generated': len(alerts_payload)
+        }
+        
+        # Commit the whole batch at once
+        db.session.commit()
+        
+        # Notify SSE clients with the newest frame of each trip
+        if REDIS_URL or sse_clients:
+            for _, _, frame_id, _ in stats.values():
+                broadcaster.submit(broadcast_frame, frame_id)
+        
+        return ojsonify({
+            'success': True,
+            'message': 'Telemetry batch ingested successfully',
+            'data': response_data
+        }), 201
+        
+    except Exception as e:
+        db.session.rollback()
+        app.logger.error(f"Telemetry batch ingestion error: {str(e)}")
+        return ojsonify({
             'success': False,
             'error': f'Server error: {str(e)}'
         }), 500
@@ -515,9 +965,9 @@ def ingest_telemetry():
 def get_trucks():
     """Get all registered trucks."""
     trucks = Truck.query.filter_by(is_active=True).all()
-    return jsonify({
+    return ojsonify({
         'success': True,
-        'data': [t.to_dict() for t in trucks]
+        'data': [t.to_dto() for t in trucks]
     })
 
 
@@ -526,34 +976,35 @@ def get_trips():
     """Get all trips, optionally filtered by status."""
     status = request.args.get('status', 'ACTIVE')
     trips = Trip.query.filter_by(status=status).order_by(Trip.started_at.desc()).all()
-    return jsonify({
+    return ojsonify({
         'success': True,
-        'data': [t.to_dict() for t in trips]
+        'data': [t.to_dto() for t in trips]
     })
 
 
 @app.route('/api/v1/trips/<trip_id>/latest', methods=['GET'])
 def get_latest_telemetry(trip_id):
     """Get the most recent telemetry frame for a trip."""
-    trip = Trip.query.filter_by(trip_id=trip_id).first()
+    trip = Trip.query.options(
+        joinedload(Trip.truck),
+        joinedload(Trip.latest_frame).selectinload(TelemetryFrame.sensor_readings)
+    ).filter_by(trip_id=trip_id).first()
     if not trip:
-        return jsonify({'success': False, 'error': 'Trip not found'}), 404
+        return ojsonify({'success': False, 'error': 'Trip not found'}), 404
     
-    frame = TelemetryFrame.query.filter_by(trip_id=trip.id)\
-        .order_by(TelemetryFrame.timestamp.desc()).first()
+    frame = trip.latest_frame
     
     if not frame:
-        return jsonify({'success': False, 'error': 'No telemetry data'}), 404
+        return ojsonify({'success': False, 'error': 'No telemetry data'}), 404
     
-    # Get sensor readings for this frame
-    readings = SensorReading.query.filter_by(frame_id=frame.id).all()
+    readings = frame.sensor_readings
     
-    return jsonify({
+    return ojsonify({
         'success': True,
         'data': {
-            'frame': frame.to_dict(),
-            'sensors': [r.to_dict() for r in readings],
-            'truck': trip.truck.to_dict()
+            'frame': frame.to_dto(),
+            'sensors': [r.to_dto() for r in readings],
+            'truck': trip.truck.to_dto()
         }
     })
 
@@ -564,61 +1015,57 @@ def get_dashboard_summary():
     Get comprehensive dashboard data.
     Returns latest position, sensors, and alerts for all active trips.
     """
-    active_trips = Trip.query.filter_by(status='ACTIVE').all()
+    # Trips, trucks and latest frames in one joined SELECT, then readings
+    # and alerts for all of those frames in one SELECT each.
+    active_trips = Trip.query.options(
+        joinedload(Trip.truck),
+        joinedload(Trip.latest_frame).selectinload(TelemetryFrame.sensor_readings),
+        joinedload(Trip.latest_frame).selectinload(TelemetryFrame.alerts)
+    ).filter_by(status='ACTIVE').all()
     
-    dashboard_data = []
-    
-    for trip in active_trips:
-        # Get latest frame
-        frame = TelemetryFrame.query.filter_by(trip_id=trip.id)\
-            .order_by(TelemetryFrame.timestamp.desc()).first()
+    def generate():
+        # Encode and send one trip at a time instead of building the whole payload
+        yield b'{"success":true,"data":['
+        first = True
         
-        if not frame:
-            continue
+        for trip in active_trips:
+            frame = trip.latest_frame
+            
+            if not frame:
+                continue
+            
+            readings = frame.sensor_readings
+            frame_dto = frame.to_dto()
+            
+            # Unresolved alerts for the latest frame
+            recent_alerts = [a for a in frame.alerts if not a.is_resolved]
+            
+            entry = orjson.dumps({
+                'trip': trip.to_dto(),
+                'truck': trip.truck.to_dto(),
+                'location': frame_dto.location,
+                'gateway_health': frame_dto.gateway_health,
+                'timestamp': frame.timestamp,
+                'sensors': [r.to_dto() for r in readings],
+                'alerts': [a.to_dto() for a in recent_alerts]
+            }, option=ORJSON_OPTIONS)
+            yield entry if first else b',' + entry
+            first = False
         
-        # Get sensor readings
-        readings = SensorReading.query.filter_by(frame_id=frame.id).all()
-        
-        # Get recent alerts (last 24 hours)
-        recent_alerts = SystemAlert.query.filter_by(frame_id=frame.id)\
-            .filter_by(is_resolved=False).all()
-        
-        dashboard_data.append({
-            'trip': trip.to_dict(),
-            'truck': trip.truck.to_dict(),
-            'location': {
-                'lat': frame.latitude,
-                'lng': frame.longitude,
-                'speed_kmh': frame.speed_kmh,
-                'heading_deg': frame.heading_deg,
-                'satellites': frame.satellites
-            },
-            'gateway_health': {
-                'battery_mv': frame.battery_mv,
-                'signal_strength_dbm': frame.signal_strength_dbm,
-                'uptime_seconds': frame.uptime_seconds,
-                'cpu_temp_c': frame.cpu_temp_c
-            },
-            'timestamp': frame.timestamp.isoformat() if frame.timestamp else None,
-            'sensors': [r.to_dict() for r in readings],
-            'alerts': [a.to_dict() for a in recent_alerts]
-        })
+        yield b'],"timestamp":' + orjson.dumps(datetime.utcnow(), option=ORJSON_OPTIONS) + b'}'
     
-    return jsonify({
-        'success': True,
-        'data': dashboard_data,
-        'timestamp': datetime.utcnow().isoformat()
-    })
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 
 @app.route('/api/v1/alerts', methods=['GET'])
 def get_alerts():
     """Get all unresolved alerts."""
-    alerts = SystemAlert.query.filter_by(is_resolved=False)\
+    # Literal false (not a bound parameter) so SQLite can match the partial index
+    alerts = SystemAlert.query.filter(SystemAlert.is_resolved == db.false())\
         .order_by(SystemAlert.created_at.desc()).limit(100).all()
-    return jsonify({
+    return ojsonify({
         'success': True,
-        'data': [a.to_dict() for a in alerts]
+        'data': [a.to_dto() for a in alerts]
     })
 
 
@@ -627,13 +1074,13 @@ def resolve_alert(alert_id):
     """Mark an alert as resolved."""
     alert = SystemAlert.query.get(alert_id)
     if not alert:
-        return jsonify({'success': False, 'error': 'Alert not found'}), 404
+        return ojsonify({'success': False, 'error': 'Alert not found'}), 404
     
     alert.is_resolved = True
     alert.resolved_at = datetime.utcnow()
     db.session.commit()
     
-    return jsonify({
+    return ojsonify({
         'success': True,
         'message': 'Alert resolved'
     })
@@ -647,11 +1094,11 @@ def resolve_alert(alert_id):
 def stream():
     """Server-Sent Events endpoint for real-time updates."""
     def event_stream():
-        # Create a queue for this client
-        client_queue = queue.Queue(maxsize=10)
+        # Create a buffer for this client
+        client = SSEClient()
         
         with sse_lock:
-            sse_clients.append(client_queue)
+            sse_clients.append(client)
         
         try:
             # Send initial connection message
@@ -659,21 +1106,44 @@ def stream():
             
             # Stream events to client
             while True:
-                try:
-                    # Wait for new data (with timeout to send keepalive)
-                    data = client_queue.get(timeout=30)
-                    yield f"data: {json.dumps(data)}\n\n"
-                except queue.Empty:
+                # Wait for new data (with timeout to send keepalive)
+                message = client.pop(timeout=30)
+                if message is None:
                     # Send keepalive comment
                     yield ": keepalive\n\n"
+                else:
+                    yield f"data: {message}\n\n"
         except GeneratorExit:
             # Client disconnected
             with sse_lock:
-                if client_queue in sse_clients:
-                    sse_clients.remove(client_queue)
+                if client in sse_clients:
+                    sse_clients.remove(client)
+    
+    def redis_event_stream():
+        pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(SSE_CHANNEL)
+        
+        try:
+            # Send initial connection message
+            yield 'data: {"type": "connected"}\n\n'
+            
+            # Stream events to client
+            while True:
+                # Wait for new data (with timeout to send keepalive)
+                message = pubsub.get_message(timeout=30)
+                if message is None:
+                    # Send keepalive comment
+                    yield ": keepalive\n\n"
+                else:
+                    yield f"data: {message['data'].decode()}\n\n"
+        finally:
+            # Client disconnected
+            pubsub.close()
+    
+    events = redis_event_stream() if REDIS_URL else event_stream()
     
     return Response(
-        stream_with_context(event_stream()),
+        stream_with_context(events),
         mimetype='text/event-stream',
         headers={
             'Cache-Control': 'no-cache',
@@ -696,11 +1166,11 @@ def dashboard():
 @app.route('/health')
 def health_check():
     """Health check endpoint for monitoring."""
-    return jsonify({
+    return ojsonify({
         'status': 'healthy',
         'service': 'VECNA Backend',
         'version': '1.0.0',
-        'timestamp': datetime.utcnow().isoformat()
+        'timestamp': datetime.utcnow()
     })
 
 
@@ -708,10 +1178,52 @@ def health_check():
 # DATABASE INITIALIZATION
 # ============================================================================
 
+# Additive column migrations for databases created by earlier versions.
+# Each entry: (table, column, column DDL, backfill SQL or None)
+COLUMN_MIGRATIONS = [
+    ('telemetry_frames', 'sensor_count', 'INTEGER DEFAULT 0',
+     'UPDATE telemetry_frames SET sensor_count = '
+     '(SELECT COUNT(*) FROM sensor_readings WHERE sensor_readings.frame_id = telemetry_frames.id)'),
+    ('trucks', 'updated_at', 'TIMESTAMP',
+     'UPDATE trucks SET updated_at = registered_at'),
+    ('trips', 'latest_frame_id', 'INTEGER REFERENCES telemetry_frames (id)',
+     'UPDATE trips SET latest_frame_id = '
+     '(SELECT id FROM telemetry_frames WHERE telemetry_frames.trip_id = trips.id '
+     'ORDER BY timestamp DESC, id DESC LIMIT 1)'),
+]
+
+
+def upgrade_schema():
+    """Add columns and indexes missing from existing tables, backfilling new columns."""
+    inspector = db.inspect(db.engine)
+    existing = {}
+    
+    for table, column, ddl, backfill in COLUMN_MIGRATIONS:
+        if table not in existing:
+            existing[table] = {c['name'] for c in inspector.get_columns(table)}
+        if column in existing[table]:
+            continue
+        
+        db.session.execute(db.text(f'ALTER TABLE {table} ADD COLUMN {column} {ddl}'))
+        if backfill:
+            db.session.execute(db.text(backfill))
+        existing[table].add(column)
+        print(f"✓ Added column {table}.{column}")
+    
+    # create_all() only builds indexes for new tables
+    connection = db.session.connection()
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+    
+    db.session.commit()
+
+
 def init_db():
     """Initialize the database and create tables."""
     with app.app_context():
         db.create_all()
+        upgrade_schema()
         print("✓ Database initialized successfully")
 
 
@@ -770,7 +1282,8 @@ def seed_demo_data():
             signal_strength_dbm=-65,
             uptime_seconds=7200,
             cpu_temp_c=42.5,
-            has_alerts=True
+            has_alerts=True,
+            sensor_count=1
         )
         db.session.add(frame)
         db.session.flush()
@@ -828,6 +1341,7 @@ def seed_demo_data():
         
         trip.total_frames = 1
         trip.alert_count = 0
+        trip.latest_frame_id = frame.id
         
         db.session.commit()
         print("✓ Demo data seeded successfully")
@@ -6,13 +6,10 @@ set -e
 
 echo "=== VECNA Container Starting ==="
 
-# Initialize database tables
-echo "Initializing database..."
-python -c "from app import init_db; init_db()"
-
-# Seed demo data (always seed to ensure trucks exist)
-echo "Seeding demo data..."
-python -c "from app import seed_demo_data; seed_demo_data()"
+# Initialize database tables and seed demo data (always seed to ensure
+# trucks exist); one interpreter so app.py is only imported once
+echo "Initializing database and seeding demo data..."
+python -c "from app import init_db, seed_demo_data; init_db(); seed_demo_data()"
 
 echo "=== Database ready, starting application ==="
 
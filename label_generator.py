@@ -8,18 +8,25 @@ from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.units import mm, inch
 from reportlab.pdfgen import canvas
 from reportlab.lib.colors import HexColor, white, black
-from reportlab.graphics.shapes import Drawing, Rect, String
-from reportlab.graphics.barcode.qr import QrCodeWidget
-from reportlab.graphics import renderPDF
-import qrcode
+from reportlab.graphics.barcode import qrencoder
+from reportlab.lib.utils import ImageReader
+from pypdf import PdfWriter
 from PIL import Image
 import cv2
 import numpy as np
 import io
+import math
+import multiprocessing
 import os
+import tempfile
+import threading
 import uuid
-import json
+import zlib
+import orjson
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # ArUco dictionary for marker generation
 ARUCO_DICT = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_250)
@@ -29,39 +36,80 @@ app = Flask(__name__)
 # Configuration
 LABEL_WIDTH = 80 * mm   # 8 cm width
 LABEL_HEIGHT = 45 * mm  # 4.5 cm height
+LABEL_FORM = 'vecna_label_bg'  # Form XObject name for the static label artwork
+
+# Labels per /api/generate-labels request, and the size above which the PDF
+# is rendered in the background (poll /api/label-task/<id> for the result)
+MAX_LABELS = 5000
+ASYNC_LABEL_THRESHOLD = 200
+
+# Page layout: 2 columns x 4 rows of labels per A4 page
+LABELS_PER_PAGE = 8
+
+# Batches at least this large are rendered across worker processes;
+# below it, process start-up costs more than it saves
+PARALLEL_MIN_LABELS = 200
+
+# ArUco marker placement within a label (left side), ID caption below it
+ARUCO_X = 3 * mm
+ARUCO_Y = 5 * mm
+ARUCO_SIZE = 14 * mm
+ARUCO_CAPTION_Y = ARUCO_Y - 3 * mm
+
+# Marker raster size. DICT_4X4 markers are 6x6 cells, so 60 px gives whole
+# 10 px cells (plus a 6 px border); the PDF scales it up without losing
+# detail, at 1/11 of the pixels of a 200 px marker
+ARUCO_MARKER_PX = 60
+
+# Spoilage indicator bar placement within a label (right of the ArUco marker)
+INDICATOR_X = 20 * mm
+INDICATOR_Y = 8 * mm
+INDICATOR_W = 45 * mm
+INDICATOR_H = 10 * mm
+
+# QR code placement within a label (bottom right corner)
+QR_SIZE = 9 * mm
+QR_X = LABEL_WIDTH - QR_SIZE - 2 * mm
+QR_Y = 2 * mm
+QR_BORDER_MODULES = 4  # Quiet zone around the QR symbol, in modules
+
+# Label colors, parsed once
+COLOR_LABEL_EDGE = HexColor('#E0E0E0')
+COLOR_HEADER = HexColor('#A8C8E8')
+COLOR_ICON = HexColor('#4A7AB0')
+COLOR_TITLE = HexColor('#2C5282')
+COLOR_ACCENT = HexColor('#4A6FA5')
+COLOR_CAPTION = HexColor('#666666')
+COLOR_SPOILED_TEXT = HexColor('#8B4513')
+COLOR_BAR_FRESH = HexColor('#F5F5F5')
+COLOR_BAR_TRANSITION = HexColor('#C4A574')
+COLOR_BAR_SPOILED = HexColor('#8B6914')
+
 OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'generated_labels')
 
 # Ensure output directory exists
 os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-
-def generate_qr_code(data: str, size: int = 100) -> Image.Image:
-    """Generate a QR code image from data."""
-    qr = qrcode.QRCode(
-        version=1,
-        error_correction=qrcode.constants.ERROR_CORRECT_M,
-        box_size=10,
-        border=2,
-    )
-    qr.add_data(data)
-    qr.make(fit=True)
-    
-    img = qr.make_image(fill_color="black", back_color="white")
-    return img
+# Background rendering for large label batches: task_id -> (future, filename).
+# A task is dropped once its final status has been polled; tasks nobody
+# polls are evicted oldest-first beyond MAX_LABEL_TASKS.
+MAX_LABEL_TASKS = 256
+label_executor = ThreadPoolExecutor(max_workers=2)
+label_tasks = OrderedDict()
+label_tasks_lock = threading.Lock()
 
 
 def generate_aruco_marker(marker_id: int, size: int = 200) -> Image.Image:
     """Generate an ArUco marker image."""
-    # Generate the marker
-    marker_image = cv2.aruco.generateImageMarker(ARUCO_DICT, marker_id, size)
-    
-    # Add white border
+    # White canvas including the border
     border_size = size // 10
-    marker_with_border = cv2.copyMakeBorder(
-        marker_image, 
-        border_size, border_size, border_size, border_size,
-        cv2.BORDER_CONSTANT, 
-        value=255
+    full_size = size + 2 * border_size
+    marker_with_border = np.full((full_size, full_size), 255, dtype=np.uint8)
+    
+    # Generate the marker straight into the centre, no separate padding copy
+    cv2.aruco.generateImageMarker(
+        ARUCO_DICT, marker_id, size,
+        marker_with_border[border_size:border_size + size, border_size:border_size + size]
     )
     
     # Convert to PIL Image
@@ -69,10 +117,37 @@ def generate_aruco_marker(marker_id: int, size: int = 200) -> Image.Image:
     return pil_image
 
 
+@lru_cache(maxsize=256)
+def aruco_reader(marker_id: int) -> ImageReader:
+    """
+    ArUco marker as a reusable ImageReader, rendered once per marker ID.
+    ReportLab reads the PIL image directly; a PNG round-trip would only be
+    decoded and re-compressed into the PDF again.
+    """
+    return ImageReader(generate_aruco_marker(marker_id, ARUCO_MARKER_PX))
+
+
+def qr_reader(qr_data: str) -> ImageReader:
+    """
+    QR code as a grayscale image with one pixel per module plus the
+    standard 4-module quiet zone. Drawn as a single image XObject instead of
+    one rectangle per run of dark modules.
+    """
+    qr = qrencoder.QRCode(None, qrencoder.QRErrorCorrectLevel.L)
+    qr.addData(qr_data)
+    qr.make()
+    
+    modules = np.array(qr.modules, dtype=bool)
+    size = modules.shape[0] + 2 * QR_BORDER_MODULES
+    qr_image = np.full((size, size), 255, dtype=np.uint8)
+    qr_image[QR_BORDER_MODULES:size - QR_BORDER_MODULES, QR_BORDER_MODULES:size - QR_BORDER_MODULES][modules] = 0
+    return ImageReader(Image.fromarray(qr_image))
+
+
 def draw_spoilage_indicator(c: canvas.Canvas, x: float, y: float, width: float, height: float):
     """Draw the spoilage indicator gradient bar."""
     # Draw border
-    c.setStrokeColor(HexColor('#4A6FA5'))
+    c.setStrokeColor(COLOR_ACCENT)
     c.setLineWidth(1.5)
     c.roundRect(x, y, width, height, 5, stroke=1, fill=0)
     
@@ -85,24 +160,28 @@ def draw_spoilage_indicator(c: canvas.Canvas, x: float, y: float, width: float,
     # Draw gradient segments (FRESH to SPOILED)
     # Fresh section (white/light gray) - 70%
     fresh_width = inner_width * 0.70
-    c.setFillColor(HexColor('#F5F5F5'))
+    c.setFillColor(COLOR_BAR_FRESH)
     c.rect(inner_x, inner_y, fresh_width, inner_height, stroke=0, fill=1)
     
     # Transition section (tan/beige) - 15%
     trans_x = inner_x + fresh_width
     trans_width = inner_width * 0.15
-    c.setFillColor(HexColor('#C4A574'))
+    c.setFillColor(COLOR_BAR_TRANSITION)
     c.rect(trans_x, inner_y, trans_width, inner_height, stroke=0, fill=1)
     
     # Spoiled section (brown) - 15%
     spoil_x = trans_x + trans_width
     spoil_width = inner_width * 0.15
-    c.setFillColor(HexColor('#8B6914'))
+    c.setFillColor(COLOR_BAR_SPOILED)
     c.rect(spoil_x, inner_y, spoil_width, inner_height, stroke=0, fill=1)
 
 
-def draw_vecna_label(c: canvas.Canvas, x: float, y: float, label_data: dict):
-    """Draw a single VECNA spoilage indicator label."""
+def draw_label_background(c: canvas.Canvas):
+    """
+    Draw everything that is identical on every label, with the label's
+    lower-left corner at the origin: box, header, icon, titles, ArUco
+    frame and the spoilage indicator bar with its captions.
+    """
     
     # Label dimensions
     w = LABEL_WIDTH
@@ -110,125 +189,118 @@ def draw_vecna_label(c: canvas.Canvas, x: float, y: float, label_data: dict):
     
     # Draw white background with rounded corners
     c.setFillColor(white)
-    c.setStrokeColor(HexColor('#E0E0E0'))
+    c.setStrokeColor(COLOR_LABEL_EDGE)
     c.setLineWidth(0.5)
-    c.roundRect(x, y, w, h, 6, stroke=1, fill=1)
+    c.roundRect(0, 0, w, h, 6, stroke=1, fill=1)
     
     # Draw header wave/banner (blue arc) - scaled for smaller label
-    c.setFillColor(HexColor('#A8C8E8'))
+    c.setFillColor(COLOR_HEADER)
     c.saveState()
     path = c.beginPath()
-    path.moveTo(x, y + h - 12*mm)
-    path.curveTo(x + w*0.3, y + h - 8*mm, x + w*0.7, y + h - 14*mm, x + w, y + h - 10*mm)
-    path.lineTo(x + w, y + h)
-    path.lineTo(x, y + h)
+    path.moveTo(0, h - 12*mm)
+    path.curveTo(w*0.3, h - 8*mm, w*0.7, h - 14*mm, w, h - 10*mm)
+    path.lineTo(w, h)
+    path.lineTo(0, h)
     path.close()
     c.drawPath(path, fill=1, stroke=0)
     c.restoreState()
     
     # Draw bird/whale icon (simplified) - smaller
-    c.setFillColor(HexColor('#4A7AB0'))
-    icon_x = x + 6*mm
-    icon_y = y + h - 9*mm
+    c.setFillColor(COLOR_ICON)
+    icon_x = 6*mm
+    icon_y = h - 9*mm
     c.circle(icon_x, icon_y + 1.5*mm, 3*mm, stroke=0, fill=1)
     c.setFillColor(white)
     c.circle(icon_x - 0.8*mm, icon_y + 2*mm, 0.6*mm, stroke=0, fill=1)  # Eye
     
     # PROJECT VECNA title
-    c.setFillColor(HexColor('#2C5282'))
+    c.setFillColor(COLOR_TITLE)
     c.setFont("Helvetica-Bold", 11)
-    c.drawString(x + 14*mm, y + h - 8*mm, "PROJECT VECNA")
+    c.drawString(14*mm, h - 8*mm, "PROJECT VECNA")
     
     # SPOILAGE INDICATOR header
-    c.setFillColor(HexColor('#4A6FA5'))
+    c.setFillColor(COLOR_ACCENT)
     c.setFont("Helvetica-Bold", 7)
-    c.drawString(x + 20*mm, y + h - 14*mm, "SPOILAGE INDICATOR")
-    
-    # Generate unique ArUco marker ID from package_id
-    package_id = label_data.get('package_id', str(uuid.uuid4())[:8])
-    marker_id = hash(package_id) % 250
-    
-    # Generate and draw ArUco marker on left side
-    aruco_img = generate_aruco_marker(marker_id, 200)
-    aruco_buffer = io.BytesIO()
-    aruco_img.save(aruco_buffer, format='PNG')
-    aruco_buffer.seek(0)
-    
-    # ArUco marker position - left side, scaled for smaller label
-    aruco_x = x + 3*mm
-    aruco_y = y + 5*mm
-    aruco_size = 14*mm
+    c.drawString(20*mm, h - 14*mm, "SPOILAGE INDICATOR")
     
     # Draw ArUco border
     c.setStrokeColor(black)
     c.setLineWidth(1.5)
-    c.rect(aruco_x - 0.5*mm, aruco_y - 0.5*mm, aruco_size + 1*mm, aruco_size + 1*mm, stroke=1, fill=0)
+    c.rect(ARUCO_X - 0.5*mm, ARUCO_Y - 0.5*mm, ARUCO_SIZE + 1*mm, ARUCO_SIZE + 1*mm, stroke=1, fill=0)
     
-    # Draw ArUco marker image
-    from reportlab.lib.utils import ImageReader
-    aruco_buffer.seek(0)
-    aruco_reader = ImageReader(aruco_buffer)
-    c.drawImage(aruco_reader, aruco_x, aruco_y, width=aruco_size, height=aruco_size)
+    # Draw spoilage indicator bar (next to ArUco marker). Part of the shared
+    # label form, so its segments are emitted once per document.
+    draw_spoilage_indicator(c, INDICATOR_X, INDICATOR_Y, INDICATOR_W, INDICATOR_H)
     
-    # ArUco ID label below marker
+    # Draw FRESH and SPOILED labels below the indicator bar
+    c.setFont("Helvetica-Bold", 5)
+    c.setFillColor(COLOR_CAPTION)
+    c.drawString(INDICATOR_X + 2*mm, INDICATOR_Y - 3*mm, "FRESH")
+    
+    c.setFillColor(COLOR_SPOILED_TEXT)
+    c.drawString(INDICATOR_X + INDICATOR_W - 10*mm, INDICATOR_Y - 3*mm, "SPOILED")
+
+
+def set_caption_style(c: canvas.Canvas):
+    """Font and fill for the per-label ArUco caption, set once per page."""
     c.setFont("Helvetica", 5)
-    c.setFillColor(HexColor('#666666'))
-    c.drawString(aruco_x, aruco_y - 3*mm, f"ArUco: {marker_id}")
+    c.setFillColor(COLOR_CAPTION)
+
+
+def draw_vecna_label(c: canvas.Canvas, x: float, y: float, label_data: dict):
+    """Draw a single VECNA spoilage indicator label (expects set_caption_style on the page)."""
     
-    # Draw spoilage indicator bar (next to ArUco marker)
-    indicator_x = x + 20*mm
-    indicator_y = y + 8*mm
-    indicator_w = 45*mm
-    indicator_h = 10*mm
-    draw_spoilage_indicator(c, indicator_x, indicator_y, indicator_w, indicator_h)
+    # Static artwork is recorded once per document as a form XObject and
+    # referenced by every label instead of re-emitting its drawing operators
+    if not c.hasForm(LABEL_FORM):
+        c.beginForm(LABEL_FORM, -1, -1, LABEL_WIDTH + 1, LABEL_HEIGHT + 1)
+        draw_label_background(c)
+        c.endForm()
     
-    # Draw FRESH and SPOILED labels below the indicator bar
-    c.setFont("Helvetica-Bold", 5)
-    c.setFillColor(HexColor('#666666'))
-    c.drawString(indicator_x + 2*mm, indicator_y - 3*mm, "FRESH")
+    c.saveState()
+    c.translate(x, y)
+    c.doForm(LABEL_FORM)
+    c.restoreState()
     
-    c.setFillColor(HexColor('#8B4513'))
-    c.drawString(indicator_x + indicator_w - 10*mm, indicator_y - 3*mm, "SPOILED")
+    # Derive the ArUco marker ID from package_id with a stable checksum, so the
+    # same package gets the same marker in every process (str hash() is salted)
+    package_id = label_data.get('package_id', str(uuid.uuid4())[:8])
+    marker_id = zlib.crc32(package_id.encode()) % 250
     
-    # Draw QR code in bottom RIGHT corner
-    is_spoiled = label_data.get('is_spoiled', False)
+    # Draw ArUco marker image (cached per marker ID)
+    c.drawImage(aruco_reader(marker_id), x + ARUCO_X, y + ARUCO_Y, width=ARUCO_SIZE, height=ARUCO_SIZE)
     
-    qr_data = json.dumps({
-        'id': package_id,
-        'product': label_data.get('product_type', 'Chicken'),
-        'packed': label_data.get('pack_date', datetime.now().isoformat()),
-        'batch': label_data.get('batch_id', 'BATCH-001'),
-        'aruco_id': marker_id,
-        'is_spoiled': is_spoiled
-    })
+    # ArUco ID label below marker
+    c.drawString(x + ARUCO_X, y + ARUCO_CAPTION_Y, f"ArUco: {marker_id}")
     
-    qr_size = 9*mm
-    qr_x = x + w - qr_size - 2*mm
-    qr_y = y + 2*mm
+    # Draw QR code in bottom RIGHT corner
+    is_spoiled = label_data.get('is_spoiled', False)
     
-    qr_widget = QrCodeWidget(qr_data)
-    qr_widget.barWidth = qr_size
-    qr_widget.barHeight = qr_size
-    qr_drawing = Drawing(qr_size, qr_size)
-    qr_drawing.add(qr_widget)
-    renderPDF.draw(qr_drawing, c, qr_x, qr_y)
+    # Compact C-encoded JSON with one-letter sorted keys: a shorter payload
+    # often fits a smaller QR version. Keys: i=id, p=product, d=packed date,
+    # b=batch, a=ArUco id, s=spoiled flag (expanded again by the detector).
+    qr_data = orjson.dumps({
+        'i': package_id,
+        'p': label_data.get('product_type', 'Chicken'),
+        'd': label_data.get('pack_date') or datetime.now().isoformat(),
+        'b': label_data.get('batch_id', 'BATCH-001'),
+        'a': marker_id,
+        's': int(is_spoiled)
+    }, option=orjson.OPT_SORT_KEYS).decode()
+    
+    c.drawImage(qr_reader(qr_data), x + QR_X, y + QR_Y, width=QR_SIZE, height=QR_SIZE)
 
 
-def generate_label_pdf(labels_data: list, filename: str = None) -> str:
-    """Generate a PDF with multiple labels."""
-    if not filename:
-        filename = f"vecna_labels_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
-    
-    filepath = os.path.join(OUTPUT_DIR, filename)
-    
+def render_labels(labels_data: list, target):
+    """Lay labels out on A4 pages and save the PDF to target (a path or writable file object)."""
     # Create PDF
-    c = canvas.Canvas(filepath, pagesize=A4)
+    # invariant=1 keeps output deterministic (fixed dates and IDs), so
+    # identical chunks render byte-identical
+    c = canvas.Canvas(target, pagesize=A4, pageCompression=1, invariant=1)
     page_width, page_height = A4
     
     # Calculate grid layout (2 columns, 4 rows per page)
     cols = 2
-    rows = 4
-    labels_per_page = cols * rows
     
     margin_x = 15*mm
     margin_y = 15*mm
@@ -236,12 +308,14 @@ def generate_label_pdf(labels_data: list, filename: str = None) -> str:
     spacing_y = 10*mm
     
     for i, label_data in enumerate(labels_data):
-        page_index = i // labels_per_page
-        label_index = i % labels_per_page
+        label_index = i % LABELS_PER_PAGE
         
-        # New page if needed
-        if label_index == 0 and i > 0:
-            c.showPage()
+        # New page if needed; showPage resets the graphics state, and the
+        # form and images restore theirs, so the caption style holds all page
+        if label_index == 0:
+            if i > 0:
+                c.showPage()
+            set_caption_style(c)
         
         # Calculate position
         col = label_index % cols
@@ -253,6 +327,47 @@ def generate_label_pdf(labels_data: list, filename: str = None) -> str:
         draw_vecna_label(c, x, y, label_data)
     
     c.save()
+
+
+def generate_label_pdf(labels_data: list, filename: str = None) -> str:
+    """Generate a PDF with multiple labels."""
+    if not filename:
+        filename = f"vecna_labels_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    
+    filepath = os.path.join(OUTPUT_DIR, filename)
+    
+    num_pages = math.ceil(len(labels_data) / LABELS_PER_PAGE)
+    workers = min(os.cpu_count() or 1, num_pages)
+    if len(labels_data) < PARALLEL_MIN_LABELS or workers < 2:
+        render_labels(labels_data, filepath)
+        return filepath
+    
+    # Large batch: render whole-page chunks in worker processes, then merge
+    chunk_size = math.ceil(num_pages / workers) * LABELS_PER_PAGE
+    chunks = [labels_data[i:i + chunk_size] for i in range(0, len(labels_data), chunk_size)]
+    part_paths = []
+    
+    try:
+        # Unique part files: two batches with the same filename may render at once
+        for _ in chunks:
+            fd, part_path = tempfile.mkstemp(suffix='.pdf', dir=OUTPUT_DIR)
+            os.close(fd)
+            part_paths.append(part_path)
+        
+        # Spawned workers: forking this multi-threaded server could deadlock a child
+        spawn = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=len(chunks), mp_context=spawn) as executor:
+            list(executor.map(render_labels, chunks, part_paths))
+        
+        writer = PdfWriter()
+        for part_path in part_paths:
+            writer.append(part_path)
+        writer.write(filepath)
+    finally:
+        for part_path in part_paths:
+            if os.path.exists(part_path):
+                os.remove(part_path)
+    
     return filepath
 
 
@@ -272,17 +387,30 @@ def api_generate_labels():
     try:
         data = request.get_json()
         
-        num_labels = data.get('num_labels', 1)
+        # Cap the batch size; rendering cost grows linearly with it
+        try:
+            num_labels = min(int(data.get('num_labels', 1)), MAX_LABELS)
+        except (TypeError, ValueError):
+            num_labels = 0
+        if num_labels < 1:
+            return jsonify({
+                'success': False,
+                'error': 'num_labels must be a whole number of at least 1'
+            }), 400
         product_type = data.get('product_type', 'Chicken')
-        batch_id = data.get('batch_id', f"BATCH-{datetime.now().strftime('%Y%m%d')}")
-        pack_date = data.get('pack_date', datetime.now().isoformat())
+        # One clock read, formatted once, for every default below
+        now = datetime.now()
+        batch_id = data.get('batch_id') or f"BATCH-{now:%Y%m%d}"
+        pack_date = data.get('pack_date') or now.isoformat()
         is_spoiled = data.get('is_spoiled', False)  # True = spoiled, False = fresh
         
-        # Generate label data
+        # Generate label data; random bytes for every package ID come from a
+        # single os.urandom call (4 bytes = 8 hex chars per ID)
+        random_bytes = os.urandom(4 * num_labels)
         labels_data = []
         for i in range(num_labels):
             label = {
-                'package_id': f"PKG-{uuid.uuid4().hex[:8].upper()}",
+                'package_id': f"PKG-{random_bytes[4*i:4*i + 4].hex().upper()}",
                 'product_type': product_type,
                 'batch_id': batch_id,
                 'pack_date': pack_date,
@@ -291,8 +419,24 @@ def api_generate_labels():
             }
             labels_data.append(label)
         
+        filename = f"vecna_labels_{batch_id}_{now:%H%M%S}.pdf"
+        
+        # Large batches render in the background; the client polls for the result
+        if num_labels > ASYNC_LABEL_THRESHOLD:
+            task_id = uuid.uuid4().hex
+            future = label_executor.submit(generate_label_pdf, labels_data, filename)
+            with label_tasks_lock:
+                label_tasks[task_id] = (future, filename)
+                if len(label_tasks) > MAX_LABEL_TASKS:
+                    label_tasks.popitem(last=False)
+            return jsonify({
+                'success': True,
+                'task_id': task_id,
+                'labels_generated': num_labels,
+                'status_url': f'/api/label-task/{task_id}'
+            }), 202
+        
         # Generate PDF
-        filename = f"vecna_labels_{batch_id}_{datetime.now().strftime('%H%M%S')}.pdf"
         filepath = generate_label_pdf(labels_data, filename)
         
         return jsonify({
@@ -309,6 +453,33 @@ def api_generate_labels():
         }), 500
 
 
+@app.route('/api/label-task/<task_id>')
+def label_task_status(task_id):
+    """Poll a background label generation task."""
+    with label_tasks_lock:
+        task = label_tasks.get(task_id)
+        if task and task[0].done():
+            # Final status is reported once; the PDF stays downloadable
+            del label_tasks[task_id]
+    if not task:
+        return jsonify({'success': False, 'error': 'Task not found'}), 404
+    
+    future, filename = task
+    if not future.done():
+        return jsonify({'success': True, 'status': 'pending'})
+    
+    error = future.exception()
+    if error:
+        return jsonify({'success': False, 'status': 'failed', 'error': str(error)}), 500
+    
+    return jsonify({
+        'success': True,
+        'status': 'done',
+        'filename': filename,
+        'download_url': f'/download-labels/{filename}'
+    })
+
+
 @app.route('/download-labels/<filename>')
 def download_labels(filename):
     """Download generated label PDF."""
@@ -323,20 +494,22 @@ def preview_label():
     """Generate a preview image of a single label."""
     try:
         data = request.get_json() or {}
+        now = datetime.now()
         
         label_data = {
             'package_id': data.get('package_id', f"PKG-{uuid.uuid4().hex[:8].upper()}"),
             'product_type': data.get('product_type', 'Chicken'),
-            'batch_id': data.get('batch_id', f"BATCH-{datetime.now().strftime('%Y%m%d')}"),
-            'pack_date': data.get('pack_date', datetime.now().isoformat()),
+            'batch_id': data.get('batch_id') or f"BATCH-{now:%Y%m%d}",
+            'pack_date': data.get('pack_date') or now.isoformat(),
             'is_spoiled': data.get('is_spoiled', False)  # True = spoiled, False = fresh
         }
         
-        # Generate single label PDF
-        filename = f"preview_{uuid.uuid4().hex[:8]}.pdf"
-        filepath = generate_label_pdf([label_data], filename)
+        # Render single label PDF in memory; previews are not kept on disk
+        pdf_buffer = io.BytesIO()
+        render_labels([label_data], pdf_buffer)
+        pdf_buffer.seek(0)
         
-        return send_file(filepath, mimetype='application/pdf')
+        return send_file(pdf_buffer, mimetype='application/pdf', download_name='preview.pdf')
         
     except Exception as e:
         return jsonify({'error': str(e)}), 500
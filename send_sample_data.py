@@ -4,30 +4,46 @@ Sends sample telemetry data to the VECNA API for testing.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timezone
-import random
 import time
+import numpy as np
 
 # API Configuration
 API_URL = "http://13.214.149.18:5000/api/v1/telemetry"
 
+# Shared session: keeps the TCP connection alive between frames
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
+# Temperature bands for chicken storage (0-4°C is ideal) and their odds:
+# normal 80%, getting warm 15%, warning zone 5%
+TEMP_BANDS = [(2, 4), (5, 7), (7.5, 9)]
+TEMP_BAND_PROBS = [0.80, 0.15, 0.05]
+
+# Integer fields drawn together, inclusive bounds:
+# heading, satellites, battery_mv, signal_dbm, uptime_s, sensor battery %, link quality
+INT_LOWS = [0, 6, 3600, -80, 1000, 70, -75]
+INT_HIGHS = [359, 12, 4200, -50, 50000, 100, -60]
+
+RNG = np.random.default_rng()
+
+
 def generate_sample_payload():
     """Generate a realistic sample telemetry payload for a chicken package container."""
     
-    # Simulate slight GPS movement
-    base_lat = 13.0827 + random.uniform(-0.01, 0.01)
-    base_lng = 80.2707 + random.uniform(-0.01, 0.01)
-    
-    # Simulate realistic chicken storage temperatures (0-4°C is ideal)
+    # Simulate realistic chicken storage temperatures
     # Occasionally go above to simulate potential issues
-    temp_variation = random.choice([
-        round(random.uniform(2, 4), 1),    # Normal (80% probability)
-        round(random.uniform(2, 4), 1),    
-        round(random.uniform(2, 4), 1),    
-        round(random.uniform(2, 4), 1),    
-        round(random.uniform(5, 7), 1),    # Getting warm (15%)
-        round(random.uniform(7.5, 9), 1)   # Warning zone (5%)
-    ])
+    temp_low, temp_high = TEMP_BANDS[RNG.choice(len(TEMP_BANDS), p=TEMP_BAND_PROBS)]
+    
+    # All float fields in one draw: GPS jitter, speed, CPU temp, cargo temp
+    lat_jitter, lng_jitter, speed_kmh, cpu_temp_c, temp_c = RNG.uniform(
+        [-0.01, -0.01, 40, 35, temp_low],
+        [0.01, 0.01, 80, 55, temp_high]
+    ).tolist()
+    heading_deg, satellites, battery_mv, signal_dbm, uptime_s, battery_pct, link_quality = \
+        RNG.integers(INT_LOWS, INT_HIGHS, endpoint=True).tolist()
     
     payload = {
         "gateway_id": "TRUCK-402",
@@ -35,27 +51,28 @@ def generate_sample_payload():
         "timestamp": datetime.now(timezone.utc).isoformat().replace('+00:00', 'Z'),
         
         "location": {
-            "lat": round(base_lat, 6),
-            "lng": round(base_lng, 6),
-            "speed_kmh": round(random.uniform(40, 80), 1),
-            "heading_deg": random.randint(0, 359),
-            "satellites": random.randint(6, 12)
+            # Simulate slight GPS movement
+            "lat": round(13.0827 + lat_jitter, 6),
+            "lng": round(80.2707 + lng_jitter, 6),
+            "speed_kmh": round(speed_kmh, 1),
+            "heading_deg": heading_deg,
+            "satellites": satellites
         },
         
         "gateway_health": {
-            "battery_mv": random.randint(3600, 4200),
-            "signal_strength_dbm": random.randint(-80, -50),
-            "uptime_seconds": random.randint(1000, 50000),
-            "cpu_temp_c": round(random.uniform(35, 55), 1)
+            "battery_mv": battery_mv,
+            "signal_strength_dbm": signal_dbm,
+            "uptime_seconds": uptime_s,
+            "cpu_temp_c": round(cpu_temp_c, 1)
         },
         
         "cargo_sensors": [
             {
                 "node_id": "CHICKEN-PKG-001",
                 "product_type": "Chicken Package",
-                "temp_c": temp_variation,
-                "battery_pct": random.randint(70, 100),
-                "link_quality": random.randint(-75, -60)
+                "temp_c": round(temp_c, 1),
+                "battery_pct": battery_pct,
+                "link_quality": link_quality
             }
         ]
     }
@@ -66,10 +83,9 @@ def generate_sample_payload():
 def send_telemetry(payload):
     """Send telemetry data to the API."""
     try:
-        response = requests.post(
+        response = SESSION.post(
             API_URL,
             json=payload,
-            headers={"Content-Type": "application/json"},
             timeout=10
         )
         return response.json(), response.status_code
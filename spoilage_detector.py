@@ -7,24 +7,104 @@ import cv2
 import numpy as np
 import json
 from datetime import datetime
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, field
 from enum import Enum
 from typing import Optional, Tuple, List
+import os
+import sys
 import time
+import threading
 import base64
+import binascii
+import hashlib
 import io
+import queue
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
 from flask import Flask, render_template, request, jsonify, Response
 
+try:
+    from turbojpeg import TurboJPEG, TJPF_BGR
+except ImportError:  # PyTurboJPEG is optional; cv2.imencode is used without it
+    TurboJPEG = None
+
 # ArUco dictionary (must match label generator)
 ARUCO_DICT = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_4X4_250)
 ARUCO_PARAMS = cv2.aruco.DetectorParameters()
 
-# OpenCV QR Code detector (no external dependencies)
-QR_DETECTOR = cv2.QRCodeDetector()
+# Threads for the ArUco fallback passes (only used with more than one core)
+FALLBACK_WORKERS = os.cpu_count() or 1
+fallback_executor = ThreadPoolExecutor(max_workers=FALLBACK_WORKERS, thread_name_prefix='aruco-fallback')
+
+# Threads for QR decoding alongside the ArUco search (also multi-core only)
+qr_executor = ThreadPoolExecutor(max_workers=FALLBACK_WORKERS, thread_name_prefix='qr-decode')
+
+# Label QR payloads use one-letter keys to keep the QR small; map them back
+# to the full names (labels printed before the change carry the full names)
+QR_SHORT_KEYS = {
+    'i': 'id',
+    'p': 'product',
+    'd': 'packed',
+    'b': 'batch',
+    'a': 'aruco_id',
+    's': 'is_spoiled',
+}
 
 app = Flask(__name__)
 
 
+def relaxed_aruco_params() -> List[cv2.aruco.DetectorParameters]:
+    """Relaxed detector parameter sets for the fallback detection passes."""
+    # Parameter set 1: Default with relaxed thresholds
+    params1 = cv2.aruco.DetectorParameters()
+    params1.adaptiveThreshWinSizeMin = 3
+    params1.adaptiveThreshWinSizeMax = 23
+    params1.adaptiveThreshWinSizeStep = 5
+    params1.adaptiveThreshConstant = 7
+    params1.minMarkerPerimeterRate = 0.005  # Very small markers allowed
+    params1.maxMarkerPerimeterRate = 4.0
+    params1.polygonalApproxAccuracyRate = 0.08
+    params1.minCornerDistanceRate = 0.01
+    params1.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_SUBPIX
+    
+    # Parameter set 2: For low contrast images
+    params2 = cv2.aruco.DetectorParameters()
+    params2.adaptiveThreshWinSizeMin = 5
+    params2.adaptiveThreshWinSizeMax = 35
+    params2.adaptiveThreshWinSizeStep = 5
+    params2.adaptiveThreshConstant = 10
+    params2.minMarkerPerimeterRate = 0.005
+    params2.maxMarkerPerimeterRate = 4.0
+    params2.polygonalApproxAccuracyRate = 0.1
+    params2.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_CONTOUR
+    
+    return [params1, params2]
+
+
+def fresh_lookup_table(hsv_lower: np.ndarray, hsv_upper: np.ndarray) -> np.ndarray:
+    """
+    256x256 table indexed by [max - min, max] of a BGR pixel's channels:
+    255 where the pixel's saturation and value fall inside the given HSV
+    range (hue is ignored). V is the max channel and S = 255 * (max - min) / V,
+    computed with the same 12-bit fixed-point division cv2.cvtColor uses.
+    """
+    spread, value = np.mgrid[0:256, 0:256]
+    inverse = np.rint(np.divide(255 << 12, value, out=np.zeros(value.shape), where=value > 0)).astype(np.int64)
+    saturation = (spread * inverse + (1 << 11)) >> 12
+    in_range = (value >= hsv_lower[2]) & (value <= hsv_upper[2]) & \
+               (saturation >= hsv_lower[1]) & (saturation <= hsv_upper[1])
+    return in_range.astype(np.uint8) * 255
+
+
+def rect_iou(a: Tuple[int, int, int, int], b: Tuple[int, int, int, int]) -> float:
+    """Intersection over union of two (x, y, w, h) rectangles."""
+    ix = max(0, min(a[0] + a[2], b[0] + b[2]) - max(a[0], b[0]))
+    iy = max(0, min(a[1] + a[3], b[1] + b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = a[2] * a[3] + b[2] * b[3] - inter
+    return inter / union if union > 0 else 0.0
+
+
 class SpoilageLevel(Enum):
     """Spoilage level classification."""
     FRESH = "FRESH"
@@ -34,7 +114,26 @@ class SpoilageLevel(Enum):
     UNKNOWN = "UNKNOWN"
 
 
-@dataclass
+# Safety recommendation per spoilage level
+RECOMMENDATIONS = {
+    SpoilageLevel.FRESH: "✅ Product is fresh and safe for consumption.",
+    SpoilageLevel.SLIGHT: "⚠️ Product shows slight changes. Use within 24 hours.",
+    SpoilageLevel.MODERATE: "⚠️ Noticeable spoilage detected. Use immediately or discard.",
+    SpoilageLevel.SPOILED: "❌ Product is spoiled. DO NOT CONSUME. Dispose safely.",
+    SpoilageLevel.UNKNOWN: "❓ Unable to determine spoilage level. Inspect manually."
+}
+
+# Overlay status color (BGR) per spoilage level
+STATUS_COLORS = {
+    SpoilageLevel.FRESH: (0, 255, 0),      # Green
+    SpoilageLevel.SLIGHT: (0, 255, 255),   # Yellow
+    SpoilageLevel.MODERATE: (0, 165, 255), # Orange
+    SpoilageLevel.SPOILED: (0, 0, 255),    # Red
+    SpoilageLevel.UNKNOWN: (128, 128, 128) # Gray
+}
+
+
+@dataclass(slots=True)
 class DetectionResult:
     """Result of spoilage detection."""
     package_id: str
@@ -51,6 +150,54 @@ class DetectionResult:
     recommendation: str
 
 
+@dataclass(slots=True)
+class DetectionOutput:
+    """A detection result together with the markers and QR codes it was read from."""
+    result: Optional[DetectionResult]
+    aruco_results: List[dict]
+    qr_results: List[dict]
+    aruco: Optional[dict] = None  # Marker the indicator strip was located from
+    region: Optional[Tuple[int, int, int, int]] = None  # Indicator region that was analyzed
+
+
+@dataclass
+class _FramePreproc:
+    """
+    Images derived from one frame, shared by the QR and ArUco searches.
+    The grayscale/equalized versions are computed on first use.
+    """
+    frame: np.ndarray
+    small: np.ndarray  # Downscaled copy for the first full-frame search (may be frame itself)
+    _gray: Optional[np.ndarray] = field(default=None, repr=False)
+    _small_gray: Optional[np.ndarray] = field(default=None, repr=False)
+    _small_eq: Optional[np.ndarray] = field(default=None, repr=False)
+    
+    @property
+    def scale(self) -> float:
+        """Factor mapping coordinates in small back to the full frame."""
+        return self.frame.shape[1] / self.small.shape[1]
+    
+    @property
+    def gray(self) -> np.ndarray:
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.frame, cv2.COLOR_BGR2GRAY)
+        return self._gray
+    
+    @property
+    def small_gray(self) -> np.ndarray:
+        if self.small is self.frame:
+            return self.gray
+        if self._small_gray is None:
+            self._small_gray = cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY)
+        return self._small_gray
+    
+    @property
+    def small_eq(self) -> np.ndarray:
+        if self._small_eq is None:
+            self._small_eq = cv2.equalizeHist(self.small_gray)
+        return self._small_eq
+
+
 class VECNASpoilageDetector:
     """
     Camera-based spoilage detection for VECNA labels.
@@ -62,29 +209,90 @@ class VECNASpoilageDetector:
     # Any saturation < 40 and value > 180 is considered white/fresh
     FRESH_HSV_LOWER = np.array([0, 0, 180])
     FRESH_HSV_UPPER = np.array([180, 40, 255])
+    FRESH_LUT = fresh_lookup_table(FRESH_HSV_LOWER, FRESH_HSV_UPPER)
     
     # Spoiled: ANY color that is not white (has saturation or is dark)
     # This will be calculated as anything NOT matching fresh
     
+    # Kernels for the ArUco fallback preprocessing
+    SHARPEN_KERNEL = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
+    MORPH_KERNEL = np.ones((3, 3), np.uint8)
+    
+    # Marker tracking: padding around the last marker box (fraction of its
+    # size per side) and the height the tracked crop is resized to
+    TRACK_PAD = 0.25
+    TRACK_ROI_HEIGHT = 200
+    
+    # Live view: between full detections the shown marker is followed by a
+    # contour tracker; full detection runs again once the tracked box overlaps
+    # the last one by less than TRACK_MIN_IOU, or every TRACK_VERIFY_INTERVAL frames
+    TRACK_MIN_IOU = 0.5
+    TRACK_VERIFY_INTERVAL = 15
+    
+    # Full-frame searches run on a copy downscaled by DETECT_SCALE first, or
+    # further so its longest edge is at most DETECT_MAX_EDGE (frames narrower
+    # than DETECT_MIN_WIDTH are searched as-is)
+    DETECT_SCALE = 0.5
+    DETECT_MIN_WIDTH = 960
+    DETECT_MAX_EDGE = 960
+    
     def __init__(self, camera_id: int = 0, debug: bool = False):
         """Initialize the detector with camera settings."""
         self.camera_id = camera_id
         self.debug = debug
         self.cap = None
         self.last_detection = None
-        
+        self._tracked_rect = None  # Bounding box of the markers found in the last frame
+        
+        # Live view state (see annotate_frame)
+        self._last_result = None
+        self._last_aruco = None  # Marker the shown result belongs to, None when not tracking
+        self._last_qr_polygon = None
+        self._frames_since_verify = 0
+        self._panel_cache = None  # (result, width, panel) from _status_panel
+        self._stack_buffer = None  # Output of stack_panel, reused while the size stays the same
+        
+        # CLAHE objects hold internal buffers, so each detector keeps its own
+        self._clahe_soft = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        self._clahe_strong = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(4, 4))
+        
+        # OpenCV QR Code detector (no external dependencies); one per detector
+        # since concurrent API requests each use their own detector
+        self._qr_detector = cv2.QRCodeDetector()
+        
+        # ArUco detectors are built once and reused for every frame
+        self._default_detector = cv2.aruco.ArucoDetector(ARUCO_DICT, ARUCO_PARAMS)
+        self._relaxed_detectors = [cv2.aruco.ArucoDetector(ARUCO_DICT, params)
+                                   for params in relaxed_aruco_params()]
+        
+    def reset_tracking(self):
+        """Forget the last marker position, e.g. before an unrelated image."""
+        self._tracked_rect = None
+        self._last_aruco = None
+    
     def start_camera(self) -> bool:
         """Initialize and start the camera."""
-        self.cap = cv2.VideoCapture(self.camera_id)
+        # V4L2 directly on Linux; other platforms keep OpenCV's default backend
+        if sys.platform.startswith('linux'):
+            self.cap = cv2.VideoCapture(self.camera_id, cv2.CAP_V4L2)
+        else:
+            self.cap = cv2.VideoCapture(self.camera_id)
         if not self.cap.isOpened():
             print("Error: Could not open camera")
             return False
         
+        # Ask for MJPG (compressed on the camera) before setting the size:
+        # raw YUYV at 1280x720 usually cannot sustain 30 FPS over USB
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        
         # Set camera properties for better quality
         self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 1280)
         self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 720)
         self.cap.set(cv2.CAP_PROP_FPS, 30)
         
+        # A few buffered frames absorb capture jitter without adding much latency
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 3)
+        
         return True
     
     def stop_camera(self):
@@ -93,36 +301,58 @@ class VECNASpoilageDetector:
             self.cap.release()
             cv2.destroyAllWindows()
     
-    def decode_qr_codes(self, frame: np.ndarray) -> List[dict]:
-        """Decode QR codes in the frame using OpenCV's built-in detector."""
+    def downscale_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Reduced-resolution copy of the frame for the full-frame QR/ArUco search.
+        Frames narrower than DETECT_MIN_WIDTH are returned unchanged; large
+        photos (e.g. from a phone) are capped at DETECT_MAX_EDGE.
+        """
+        if frame.shape[1] < self.DETECT_MIN_WIDTH:
+            return frame
+        scale = min(self.DETECT_SCALE, self.DETECT_MAX_EDGE / max(frame.shape[:2]))
+        return cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    
+    def preprocess(self, frame: np.ndarray) -> _FramePreproc:
+        """Shared preprocessing for one frame, to pass to both detection methods."""
+        return _FramePreproc(frame, self.downscale_frame(frame))
+    
+    def decode_qr_codes(self, frame: np.ndarray, pre: Optional[_FramePreproc] = None) -> List[dict]:
+        """
+        Decode QR codes in the frame using OpenCV's built-in detector.
+        The downscaled copy (see downscale_frame) is searched first and the
+        full-resolution frame only if that fails; coordinates are always
+        returned in full-frame pixels.
+        """
         results = []
         
-        # Try with original frame first
-        images_to_try = [frame]
+        if pre is None:
+            pre = self.preprocess(frame)
+        factor = pre.scale
         
-        # Add preprocessed versions
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        gray_3ch = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
-        images_to_try.append(gray_3ch)
+        # Try with the downscaled frame first. The QR detector converts to
+        # grayscale and binarizes internally, so plain grayscale or sharpened
+        # copies add little; histogram equalization helps with low contrast
+        images_to_try = [(pre.small, factor)]
         
         # Histogram equalized
-        eq = cv2.equalizeHist(gray)
-        eq_3ch = cv2.cvtColor(eq, cv2.COLOR_GRAY2BGR)
-        images_to_try.append(eq_3ch)
+        eq_3ch = cv2.cvtColor(pre.small_eq, cv2.COLOR_GRAY2BGR)
+        images_to_try.append((eq_3ch, factor))
         
-        # Sharpened
-        kernel = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-        sharpened = cv2.filter2D(frame, -1, kernel)
-        images_to_try.append(sharpened)
+        # Small QR codes may only be readable at full resolution
+        if pre.small is not frame:
+            images_to_try.append((frame, 1.0))
         
-        for img in images_to_try:
+        for img, scale in images_to_try:
             try:
-                data, points, _ = QR_DETECTOR.detectAndDecode(img)
+                data, points, _ = self._qr_detector.detectAndDecode(img)
                 
                 if data and points is not None:
                     try:
                         parsed_data = json.loads(data)
-                        pts = points[0].astype(np.int32)
+                        if not isinstance(parsed_data, dict):
+                            continue
+                        parsed_data = {QR_SHORT_KEYS.get(k, k): v for k, v in parsed_data.items()}
+                        pts = (points[0] * scale).astype(np.int32)
                         results.append({
                             'data': parsed_data,
                             'polygon': pts,
@@ -136,112 +366,221 @@ class VECNASpoilageDetector:
         
         return results
     
-    def detect_aruco_markers(self, frame: np.ndarray) -> List[dict]:
-        """Detect ArUco markers in the frame with enhanced preprocessing."""
-        results = []
-        
-        # Get grayscale
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-        
-        # Create multiple detector parameter sets to try
-        param_sets = []
-        
-        # Parameter set 1: Default with relaxed thresholds
-        params1 = cv2.aruco.DetectorParameters()
-        params1.adaptiveThreshWinSizeMin = 3
-        params1.adaptiveThreshWinSizeMax = 23
-        params1.adaptiveThreshWinSizeStep = 5
-        params1.adaptiveThreshConstant = 7
-        params1.minMarkerPerimeterRate = 0.005  # Very small markers allowed
-        params1.maxMarkerPerimeterRate = 4.0
-        params1.polygonalApproxAccuracyRate = 0.08
-        params1.minCornerDistanceRate = 0.01
-        params1.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_SUBPIX
-        param_sets.append(params1)
-        
-        # Parameter set 2: For low contrast images
-        params2 = cv2.aruco.DetectorParameters()
-        params2.adaptiveThreshWinSizeMin = 5
-        params2.adaptiveThreshWinSizeMax = 35
-        params2.adaptiveThreshWinSizeStep = 5
-        params2.adaptiveThreshConstant = 10
-        params2.minMarkerPerimeterRate = 0.005
-        params2.maxMarkerPerimeterRate = 4.0
-        params2.polygonalApproxAccuracyRate = 0.1
-        params2.cornerRefinementMethod = cv2.aruco.CORNER_REFINE_CONTOUR
-        param_sets.append(params2)
-        
-        # Image preprocessing variations
-        images_to_try = []
-        
-        # Original grayscale
-        images_to_try.append(gray)
-        
-        # Histogram equalized
-        images_to_try.append(cv2.equalizeHist(gray))
-        
-        # CLAHE with different parameters
-        clahe1 = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
-        images_to_try.append(clahe1.apply(gray))
+    def _aruco_attempts(self, pre: _FramePreproc):
+        """
+        Yield (image, detector, scale) triples for the cheap ArUco detection
+        passes; scale maps the image's coordinates back to the full frame.
+        A visible marker is almost always found on the downscaled grayscale
+        or a single Otsu binarization of it; full resolution is only
+        converted if the caller keeps iterating after those miss.
+        """
+        small_gray = pre.small_gray
+        yield small_gray, self._default_detector, pre.scale
         
-        clahe2 = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(4, 4))
-        images_to_try.append(clahe2.apply(gray))
+        _, small_otsu = cv2.threshold(small_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        yield small_otsu, self._default_detector, pre.scale
         
-        # Sharpen the image
-        kernel_sharpen = np.array([[-1,-1,-1], [-1,9,-1], [-1,-1,-1]])
-        sharpened = cv2.filter2D(gray, -1, kernel_sharpen)
-        images_to_try.append(sharpened)
+        # Markers too small for the downscaled frame
+        if small_gray is not pre.gray:
+            yield pre.gray, self._default_detector, 1.0
+    
+    def _fallback_variants(self, gray: np.ndarray) -> list:
+        """Builders for the preprocessing variations tried when the cheap passes miss."""
+        _, otsu = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return [
+            lambda: gray,
+            lambda: cv2.equalizeHist(gray),
+            lambda: self._clahe_soft.apply(gray),
+            lambda: self._clahe_strong.apply(gray),
+            lambda: cv2.filter2D(gray, -1, self.SHARPEN_KERNEL),
+            lambda: otsu,
+            lambda: cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)[1],
+            lambda: cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                          cv2.THRESH_BINARY, 11, 2),
+            lambda: cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                                          cv2.THRESH_BINARY, 15, 5),
+            # Morphological close to clean up the Otsu binarization
+            lambda: cv2.morphologyEx(otsu, cv2.MORPH_CLOSE, self.MORPH_KERNEL),
+        ]
+    
+    def _fallback_pass(self, build_variant) -> Tuple[tuple, Optional[np.ndarray]]:
+        """Build one preprocessing variant and try it with both relaxed detectors."""
+        try:
+            img = build_variant()
+            for detector in self._relaxed_detectors:
+                corners, ids = self._detect_pass(img, detector)
+                if ids is not None and len(ids) > 0:
+                    return corners, ids
+        except cv2.error:
+            pass
+        return (), None
+    
+    def _detect_fallback(self, gray: np.ndarray) -> Tuple[tuple, Optional[np.ndarray]]:
+        """
+        Try every fallback preprocessing variant. With several cores the
+        variants run concurrently (OpenCV releases the GIL) and the first one
+        to find markers wins; on a single core they run in order and stop at
+        the first hit. Passes still running after a hit are waited for, as
+        they use this detector's CLAHE objects.
+        """
+        builders = self._fallback_variants(gray)
         
-        # Binary threshold at different levels
-        _, binary1 = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-        images_to_try.append(binary1)
+        if FALLBACK_WORKERS == 1:
+            for build_variant in builders:
+                corners, ids = self._fallback_pass(build_variant)
+                if ids is not None:
+                    return corners, ids
+            return (), None
         
-        _, binary2 = cv2.threshold(gray, 127, 255, cv2.THRESH_BINARY)
-        images_to_try.append(binary2)
+        futures = [fallback_executor.submit(self._fallback_pass, b) for b in builders]
+        try:
+            for future in as_completed(futures):
+                corners, ids = future.result()
+                if ids is not None:
+                    return corners, ids
+        finally:
+            # Queued passes are dropped; running ones must finish before
+            # the detector can be used for the next frame
+            for future in futures:
+                future.cancel()
+            wait(futures)
+        return (), None
+    
+    def _detect_pass(self, img: np.ndarray, detector: cv2.aruco.ArucoDetector) -> Tuple[tuple, Optional[np.ndarray]]:
+        """Run a single ArUco detection pass, returning (corners, ids)."""
+        corners, ids, _ = detector.detectMarkers(img)
+        return corners, ids
+    
+    def _detect_in_tracked_roi(self, gray: np.ndarray) -> Tuple[list, Optional[np.ndarray]]:
+        """
+        Run one detection pass on a padded crop around the last known marker
+        position. The crop is resized to a fixed height so the adaptive
+        threshold window sizes behave the same at any distance. Returns
+        (corners, ids) with corners in full-frame coordinates.
+        """
+        x, y, w, h = self._tracked_rect
+        pad_x = int(w * self.TRACK_PAD)
+        pad_y = int(h * self.TRACK_PAD)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1 = min(gray.shape[1], x + w + pad_x)
+        y1 = min(gray.shape[0], y + h + pad_y)
+        
+        roi = gray[y0:y1, x0:x1]
+        if roi.size == 0:
+            return [], None
+        
+        scale = self.TRACK_ROI_HEIGHT / roi.shape[0]
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=interpolation)
+        
+        corners, ids = self._detect_pass(roi, self._default_detector)
+        if ids is None:
+            return [], None
+        return [c / scale + (x0, y0) for c in corners], ids
+    
+    def _detect_in_candidates(self, pre: _FramePreproc) -> Tuple[list, Optional[np.ndarray]]:
+        """
+        Find square-ish quadrilaterals in an Otsu binarization of the
+        downscaled frame and run detection on a padded crop around each,
+        resized like the tracked ROI. Markers the full-frame passes miss
+        (uneven lighting, perspective) usually decode from their own crop.
+        Stops at the first candidate holding a marker; returns (corners, ids)
+        in full-frame coordinates.
+        """
+        _, binary = cv2.threshold(pre.small_gray, 0, 255, cv2.THRESH_BINARY_INV + cv2.THRESH_OTSU)
+        contours, _ = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        gray = pre.gray
+        
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
+            if w < 8 or h < 8 or not 0.5 < w / h < 2:
+                continue
+            quad = cv2.approxPolyDP(contour, 0.05 * cv2.arcLength(contour, True), True)
+            if len(quad) != 4 or not cv2.isContourConvex(quad):
+                continue
+            
+            # Crop with 1/8 padding for the quiet zone, in full-frame pixels
+            x, y, w, h = (int(v * pre.scale) for v in (x, y, w, h))
+            pad = max(w, h) // 8
+            x0, y0 = max(0, x - pad), max(0, y - pad)
+            roi = gray[y0:y + h + pad, x0:x + w + pad]
+            
+            scale = self.TRACK_ROI_HEIGHT / roi.shape[0]
+            interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+            roi = cv2.resize(roi, None, fx=scale, fy=scale, interpolation=interpolation)
+            
+            corners, ids = self._detect_pass(roi, self._default_detector)
+            if ids is not None and len(ids) > 0:
+                return [c / scale + (x0, y0) for c in corners], ids
         
-        # Adaptive threshold variations
-        adaptive1 = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                          cv2.THRESH_BINARY, 11, 2)
-        images_to_try.append(adaptive1)
+        return [], None
+    
+    def detect_aruco_markers(self, frame: np.ndarray, pre: Optional[_FramePreproc] = None) -> List[dict]:
+        """
+        Detect ArUco markers in the frame. While a marker is being tracked only
+        the region around it is searched; full-frame detection, starting on
+        the downscaled copy (see downscale_frame) and escalating only on a
+        miss, runs when tracking is lost. Before the slow preprocessing
+        variants, marker-shaped contours are tried one crop at a time.
+        """
+        results = []
         
-        adaptive2 = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
-                                          cv2.THRESH_BINARY, 15, 5)
-        images_to_try.append(adaptive2)
+        if pre is None:
+            pre = self.preprocess(frame)
         
-        # Morphological operations to clean up
-        kernel = np.ones((3, 3), np.uint8)
-        morph = cv2.morphologyEx(binary1, cv2.MORPH_CLOSE, kernel)
-        images_to_try.append(morph)
+        corners, ids = [], None
+        if self._tracked_rect is not None:
+            try:
+                corners, ids = self._detect_in_tracked_roi(pre.gray)
+            except cv2.error:
+                ids = None
         
-        # Try each parameter set with each image
-        for params in param_sets:
-            detector = cv2.aruco.ArucoDetector(ARUCO_DICT, params)
-            
-            for img in images_to_try:
+        if ids is None or len(ids) == 0:
+            for img, detector, scale in self._aruco_attempts(pre):
                 try:
-                    corners, ids, rejected = detector.detectMarkers(img)
-                    
-                    if ids is not None and len(ids) > 0:
-                        for i, marker_id in enumerate(ids):
-                            marker_corners = corners[i][0].astype(np.int32)
-                            x_min = int(np.min(marker_corners[:, 0]))
-                            y_min = int(np.min(marker_corners[:, 1]))
-                            x_max = int(np.max(marker_corners[:, 0]))
-                            y_max = int(np.max(marker_corners[:, 1]))
-                            
-                            # Check if this marker ID is already detected
-                            if not any(r['id'] == int(marker_id[0]) for r in results):
-                                results.append({
-                                    'id': int(marker_id[0]),
-                                    'corners': marker_corners,
-                                    'rect': (x_min, y_min, x_max - x_min, y_max - y_min)
-                                })
-                        
-                        # Found markers, return early
-                        if results:
-                            return results
-                except Exception:
+                    corners, ids = self._detect_pass(img, detector)
+                except cv2.error:
                     continue
+                if scale != 1.0:
+                    corners = [c * scale for c in corners]
+                
+                # Found markers, stop escalating
+                if ids is not None and len(ids) > 0:
+                    break
+            else:
+                try:
+                    corners, ids = self._detect_in_candidates(pre)
+                except cv2.error:
+                    ids = None
+                if ids is None:
+                    corners, ids = self._detect_fallback(pre.gray)
+        
+        if ids is None or len(ids) == 0:
+            self._tracked_rect = None
+            return results
+        
+        # ids is (N, 1) on OpenCV 4.x and (N,) on 5.x
+        seen_ids = set()
+        for i, marker_id in enumerate(ids.flatten().tolist()):
+            # Skip duplicate detections of the same marker ID
+            if marker_id in seen_ids:
+                continue
+            seen_ids.add(marker_id)
+            
+            marker_corners = corners[i][0].astype(np.int32)
+            x_min = int(np.min(marker_corners[:, 0]))
+            y_min = int(np.min(marker_corners[:, 1]))
+            x_max = int(np.max(marker_corners[:, 0]))
+            y_max = int(np.max(marker_corners[:, 1]))
+            
+            results.append({
+                'id': marker_id,
+                'corners': marker_corners,
+                'rect': (x_min, y_min, x_max - x_min, y_max - y_min)
+            })
+        
+        # Track the area covering every detected marker for the next frame
+        self._tracked_rect = cv2.boundingRect(np.concatenate([r['corners'] for r in results]))
         
         return results
     
@@ -261,8 +600,9 @@ class VECNASpoilageDetector:
         """
         x, y, w, h = aruco_rect
         
-        # Debug print
-        print(f"  [DEBUG] ArUco rect: x={x}, y={y}, w={w}, h={h}")
+        # Debug print (only with debug=True; this runs for every detection)
+        if self.debug:
+            print(f"  [DEBUG] ArUco rect: x={x}, y={y}, w={w}, h={h}")
         
         # The indicator strip is to the RIGHT of the ArUco marker
         # In label_generator.py:
@@ -288,7 +628,8 @@ class VECNASpoilageDetector:
         if indicator_y < 0:
             indicator_y = y
         
-        print(f"  [DEBUG] Full indicator region: x={indicator_x}, y={indicator_y}, w={strip_width}, h={strip_height}")
+        if self.debug:
+            print(f"  [DEBUG] Full indicator region: x={indicator_x}, y={indicator_y}, w={strip_width}, h={strip_height}")
         
         # Read the CENTER portion of the strip (from 25% to 75% width)
         # This is where fresh vs spoiled transition happens
@@ -300,7 +641,8 @@ class VECNASpoilageDetector:
         final_w = center_width
         final_h = strip_height
         
-        print(f"  [DEBUG] Reading center region: x={final_x}, y={final_y}, w={final_w}, h={final_h}")
+        if self.debug:
+            print(f"  [DEBUG] Reading center region: x={final_x}, y={final_y}, w={final_w}, h={final_h}")
         
         # Ensure within frame bounds
         frame_h, frame_w = frame.shape[:2]
@@ -320,31 +662,37 @@ class VECNASpoilageDetector:
         Returns spoilage level, percentage, and color readings.
         """
         x, y, w, h = region
-        indicator_roi = frame[y:y+h, x:x+w]
+        # Contiguous copy: splitting a strided view of the frame is ~3x slower
+        indicator_roi = np.ascontiguousarray(frame[y:y+h, x:x+w])
         
         if indicator_roi.size == 0:
             return SpoilageLevel.UNKNOWN, 0.0, {}
         
-        # Convert to HSV for color analysis
-        hsv = cv2.cvtColor(indicator_roi, cv2.COLOR_BGR2HSV)
-        
-        # Fresh mask: White/light gray shades only (low saturation, high value)
-        fresh_mask = cv2.inRange(hsv, self.FRESH_HSV_LOWER, self.FRESH_HSV_UPPER)
-        
-        # Spoiled: Everything that is NOT white (inverse of fresh mask)
-        spoiled_mask = cv2.bitwise_not(fresh_mask)
+        # Fresh mask: White/light gray shades only (low saturation, high value).
+        # Evaluated in BGR without an HSV conversion, by looking up each
+        # pixel's (max - min, max) channel pair in FRESH_LUT. A flat take()
+        # with a packed 16-bit index is much cheaper than 2-D fancy indexing
+        b, g, r = cv2.split(indicator_roi)
+        value = cv2.max(cv2.max(b, g), r)
+        spread = cv2.subtract(value, cv2.min(cv2.min(b, g), r))
+        fresh_mask = self.FRESH_LUT.ravel().take((spread.astype(np.uint16) << 8) | value)
         
         # Calculate percentage of each
         total_pixels = indicator_roi.shape[0] * indicator_roi.shape[1]
         if total_pixels == 0:
             return SpoilageLevel.UNKNOWN, 0.0, {}
-            
-        fresh_pct = np.sum(fresh_mask > 0) / total_pixels * 100
-        spoiled_pct = np.sum(spoiled_mask > 0) / total_pixels * 100
         
-        # Get average color values for debugging/display
-        avg_hsv = np.mean(hsv, axis=(0, 1))
-        avg_bgr = np.mean(indicator_roi, axis=(0, 1))
+        # Spoiled: Everything that is NOT white, so only the fresh pixels need counting
+        fresh_count = cv2.countNonZero(fresh_mask)
+        spoiled_count = total_pixels - fresh_count
+        
+        fresh_pct = fresh_count / total_pixels * 100
+        spoiled_pct = spoiled_count / total_pixels * 100
+        
+        # Get average color values for debugging/display (HSV of the average color)
+        avg_bgr = cv2.mean(indicator_roi)[:3]
+        avg_pixel = np.array([[avg_bgr]], dtype=np.float32).round().astype(np.uint8)
+        avg_hsv = cv2.cvtColor(avg_pixel, cv2.COLOR_BGR2HSV)[0, 0].astype(float)
         
         color_readings = {
             'fresh_percent': round(fresh_pct, 2),
@@ -373,14 +721,7 @@ class VECNASpoilageDetector:
     
     def get_recommendation(self, level: SpoilageLevel) -> str:
         """Get safety recommendation based on spoilage level."""
-        recommendations = {
-            SpoilageLevel.FRESH: "✅ Product is fresh and safe for consumption.",
-            SpoilageLevel.SLIGHT: "⚠️ Product shows slight changes. Use within 24 hours.",
-            SpoilageLevel.MODERATE: "⚠️ Noticeable spoilage detected. Use immediately or discard.",
-            SpoilageLevel.SPOILED: "❌ Product is spoiled. DO NOT CONSUME. Dispose safely.",
-            SpoilageLevel.UNKNOWN: "❓ Unable to determine spoilage level. Inspect manually."
-        }
-        return recommendations.get(level, "Check product manually.")
+        return RECOMMENDATIONS.get(level, "Check product manually.")
     
     def detect_from_frame(self, frame: np.ndarray) -> Optional[DetectionResult]:
         """
@@ -390,11 +731,41 @@ class VECNASpoilageDetector:
         
         The strip color is the GROUND TRUTH - it changes based on actual spoilage.
         """
-        # Decode QR codes for package information
-        qr_results = self.decode_qr_codes(frame)
+        return self.analyze_frame(frame).result
+    
+    def analyze_frame(self, frame: np.ndarray) -> DetectionOutput:
+        """
+        Same as detect_from_frame, but also return the ArUco markers, QR codes
+        and indicator region found on the way, so callers drawing an overlay
+        do not have to search the frame again.
+        """
+        # Grayscale/downscaled images are computed once and shared by both searches
+        pre = self.preprocess(frame)
+        
+        # With several cores the QR search runs alongside the ArUco search
+        # (OpenCV releases the GIL); on one core it waits for a marker
+        qr_future = None
+        if FALLBACK_WORKERS > 1:
+            qr_future = qr_executor.submit(self.decode_qr_codes, frame, pre)
         
         # Detect ArUco markers (REQUIRED for locating the indicator strip)
-        aruco_results = self.detect_aruco_markers(frame)
+        try:
+            aruco_results = self.detect_aruco_markers(frame, pre)
+        finally:
+            # Always wait for the QR search, even if the ArUco search raised:
+            # it uses this detector's QR decoder
+            if qr_future is not None:
+                wait([qr_future])
+        qr_results = qr_future.result() if qr_future is not None else []
+        
+        # We NEED ArUco marker to locate the indicator strip; without one
+        # there is nothing to attach package information to
+        if not aruco_results:
+            return DetectionOutput(None, aruco_results, [])
+        
+        # Decode QR codes for package information
+        if qr_future is None:
+            qr_results = self.decode_qr_codes(frame, pre)
         
         # Get QR data for package info (not for spoilage decision)
         qr_data = {}
@@ -404,10 +775,6 @@ class VECNASpoilageDetector:
                     qr_data = qr['data']
                     break
         
-        # We NEED ArUco marker to locate the indicator strip
-        if not aruco_results:
-            return None
-        
         # Process ArUco marker to find spoilage indicator
         for aruco in aruco_results:
             aruco_id = aruco['id']
@@ -436,45 +803,24 @@ class VECNASpoilageDetector:
                 )
                 
                 self.last_detection = result
-                return result
+                return DetectionOutput(result, aruco_results, qr_results, aruco, region)
         
-        return None
+        return DetectionOutput(None, aruco_results, qr_results)
     
-    def draw_detection_overlay(self, frame: np.ndarray, result: DetectionResult, aruco_corners: np.ndarray, indicator_region: Tuple[int, int, int, int], qr_polygon: np.ndarray = None) -> np.ndarray:
-        """Draw detection results on the frame."""
-        output = frame.copy()
-        
-        # Draw ArUco marker boundary (blue)
-        cv2.polylines(output, [aruco_corners], True, (255, 0, 0), 3)
-        cv2.putText(output, f"ArUco #{result.aruco_id}", 
-                    (aruco_corners[0][0], aruco_corners[0][1] - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
-        
-        # Draw QR code boundary if available (green)
-        if qr_polygon is not None:
-            cv2.polylines(output, [qr_polygon], True, (0, 255, 0), 2)
-        
-        # Draw indicator region
-        x, y, w, h = indicator_region
-        color = (0, 255, 0) if result.is_safe else (0, 0, 255)
-        cv2.rectangle(output, (x, y), (x + w, y + h), color, 2)
-        cv2.putText(output, "Indicator", (x, y - 10),
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+    def _status_panel(self, result: DetectionResult, width: int) -> np.ndarray:
+        """
+        Status panel shown below the frame. The live view shows the same
+        result for many frames, so the last rendered panel is reused.
+        """
+        cached = self._panel_cache
+        if cached is not None and cached[0] is result and cached[1] == width:
+            return cached[2]
         
-        # Draw status panel
         panel_height = 200
-        panel = np.zeros((panel_height, frame.shape[1], 3), dtype=np.uint8)
-        panel[:] = (40, 40, 40)  # Dark gray background
+        panel = np.full((panel_height, width, 3), 40, dtype=np.uint8)  # Dark gray background
         
         # Status color
-        status_colors = {
-            SpoilageLevel.FRESH: (0, 255, 0),      # Green
-            SpoilageLevel.SLIGHT: (0, 255, 255),   # Yellow
-            SpoilageLevel.MODERATE: (0, 165, 255), # Orange
-            SpoilageLevel.SPOILED: (0, 0, 255),    # Red
-            SpoilageLevel.UNKNOWN: (128, 128, 128) # Gray
-        }
-        status_color = status_colors.get(result.spoilage_level, (128, 128, 128))
+        status_color = STATUS_COLORS.get(result.spoilage_level, (128, 128, 128))
         
         # Draw status indicator
         cv2.circle(panel, (50, 50), 30, status_color, -1)
@@ -494,11 +840,134 @@ class VECNASpoilageDetector:
         cv2.putText(panel, result.recommendation[:70], (20, 160), 
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, rec_color, 1)
         
-        # Combine frame and panel
-        output = np.vstack([output, panel])
+        self._panel_cache = (result, width, panel)
+        return panel
+    
+    def draw_detection_overlay(self, frame: np.ndarray, result: DetectionResult, aruco_corners: np.ndarray, indicator_region: Tuple[int, int, int, int], qr_polygon: np.ndarray = None) -> np.ndarray:
+        """
+        Draw detection results on the frame (in place) and return it with the
+        status panel appended below.
+        """
+        output = frame
+        
+        # Draw ArUco marker boundary (blue)
+        cv2.polylines(output, [aruco_corners], True, (255, 0, 0), 3)
+        cv2.putText(output, f"ArUco #{result.aruco_id}", 
+                    (aruco_corners[0][0], aruco_corners[0][1] - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 0, 0), 2)
+        
+        # Draw QR code boundary if available (green)
+        if qr_polygon is not None:
+            cv2.polylines(output, [qr_polygon], True, (0, 255, 0), 2)
         
+        # Draw indicator region
+        x, y, w, h = indicator_region
+        color = (0, 255, 0) if result.is_safe else (0, 0, 255)
+        cv2.rectangle(output, (x, y), (x + w, y + h), color, 2)
+        cv2.putText(output, "Indicator", (x, y - 10),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 2)
+        
+        # Status panel (re-rendered only when the result or width changes)
+        panel = self._status_panel(result, frame.shape[1])
+        
+        # Combine frame and panel
+        return self.stack_panel(output, panel)
+    
+    def stack_panel(self, frame: np.ndarray, panel: np.ndarray) -> np.ndarray:
+        """
+        Return frame with panel appended below. The result is written into a
+        buffer owned by the detector, so it is only valid until the next call.
+        """
+        height = frame.shape[0]
+        shape = (height + panel.shape[0],) + frame.shape[1:]
+        output = self._stack_buffer
+        if output is None or output.shape != shape:
+            output = self._stack_buffer = np.empty(shape, dtype=np.uint8)
+        
+        output[:height] = frame
+        output[height:] = panel
         return output
     
+    def _track_marker(self, frame: np.ndarray) -> Optional[dict]:
+        """
+        Cheap tracking step for the live view: find the quadrilateral contour
+        in an Otsu-binarized crop around the last marker that best overlaps
+        it. Returns the marker dict (id, corners, rect) at its new position,
+        or None when no candidate overlaps by at least TRACK_MIN_IOU.
+        """
+        last = self._last_aruco
+        x, y, w, h = last['rect']
+        pad_x = int(w * self.TRACK_PAD)
+        pad_y = int(h * self.TRACK_PAD)
+        x0, y0 = max(0, x - pad_x), max(0, y - pad_y)
+        x1 = min(frame.shape[1], x + w + pad_x)
+        y1 = min(frame.shape[0], y + h + pad_y)
+        
+        roi = frame[y0:y1, x0:x1]
+        if roi.size == 0:
+            return None
+        
+        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
+        _, binary = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY_INV | cv2.THRESH_OTSU)
+        contours, _ = cv2.findContours(binary, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
+        
+        best, best_iou = None, self.TRACK_MIN_IOU
+        for contour in contours:
+            if cv2.contourArea(contour) < w * h * 0.25:
+                continue
+            quad = cv2.approxPolyDP(contour, 0.05 * cv2.arcLength(contour, True), True)
+            if len(quad) != 4 or not cv2.isContourConvex(quad):
+                continue
+            
+            quad = quad.reshape(4, 2) + (x0, y0)
+            rect = cv2.boundingRect(quad)
+            iou = rect_iou(rect, last['rect'])
+            if iou >= best_iou:
+                # Keep the marker's corner order so the label stays on the same corner
+                first = np.argmin(((quad - last['corners'][0]) ** 2).sum(axis=1))
+                best = {'id': last['id'], 'corners': np.roll(quad, -first, axis=0).astype(np.int32), 'rect': rect}
+                best_iou = iou
+        
+        return best
+    
+    def annotate_frame(self, frame: np.ndarray) -> np.ndarray:
+        """
+        Run detection on one camera frame and return the frame to display,
+        with the detection overlay drawn. Once a label is detected its marker
+        is followed with _track_marker and the result is reused; full
+        detection only runs when tracking is lost or is due for
+        re-verification. The overlay is drawn on frame itself, after all
+        analysis of it is done.
+        """
+        # Marker hasn't moved much: keep showing the last result
+        if self._last_aruco is not None and self._frames_since_verify < self.TRACK_VERIFY_INTERVAL:
+            tracked = self._track_marker(frame)
+            if tracked is not None:
+                self._frames_since_verify += 1
+                region = self.find_indicator_region_from_aruco(frame, tracked['rect'])
+                if region:
+                    # Move the QR outline along with the marker
+                    qr_poly = self._last_qr_polygon
+                    if qr_poly is not None:
+                        qr_poly = qr_poly + (np.array(tracked['rect'][:2]) - self._last_aruco['rect'][:2])
+                    self._last_qr_polygon = qr_poly
+                    self._last_aruco = tracked
+                    return self.draw_detection_overlay(frame, self._last_result, tracked['corners'], region, qr_poly)
+                return frame
+        
+        # Full detection; the overlay reuses the markers and QR codes it found
+        output = self.analyze_frame(frame)
+        if not output.result:
+            self._last_aruco = None
+            return frame
+        
+        qr_poly = output.qr_results[0]['polygon'] if output.qr_results else None
+        self._last_result = output.result
+        self._last_aruco = output.aruco
+        self._last_qr_polygon = qr_poly
+        self._frames_since_verify = 0
+        return self.draw_detection_overlay(frame, output.result, output.aruco['corners'], output.region, qr_poly)
+    
     def run_detection_loop(self):
         """Main detection loop with camera feed."""
         if not self.start_camera():
@@ -515,12 +984,6 @@ class VECNASpoilageDetector:
         print("  - Press 'S' to save last detection")
         print("="*60 + "\n")
         
-        detection_cooldown = 0
-        last_result = None
-        last_aruco = None
-        last_region = None
-        last_qr_polygon = None
-        
         try:
             while True:
                 ret, frame = self.cap.read()
@@ -528,56 +991,19 @@ class VECNASpoilageDetector:
                     print("Error: Could not read frame")
                     break
                 
-                display_frame = frame.copy()
-                
-                # Detect ArUco markers and QR codes
-                aruco_results = self.detect_aruco_markers(frame)
-                qr_results = self.decode_qr_codes(frame)
+                previous_result = self._last_result
+                display_frame = self.annotate_frame(frame)
+                last_result = self._last_result
                 
-                if aruco_results and detection_cooldown == 0:
-                    for aruco in aruco_results:
-                        region = self.find_indicator_region_from_aruco(frame, aruco['rect'])
-                        if region:
-                            result = self.detect_from_frame(frame)
-                            if result:
-                                last_result = result
-                                last_aruco = aruco
-                                last_region = region
-                                last_qr_polygon = qr_results[0]['polygon'] if qr_results else None
-                                
-                                display_frame = self.draw_detection_overlay(
-                                    display_frame, result, aruco['corners'], region, last_qr_polygon
-                                )
-                                detection_cooldown = 30  # Skip frames to avoid flickering
-                                
-                                # Print to console
-                                print(f"\n[{result.timestamp}] Detection:")
-                                print(f"  Package: {result.package_id}")
-                                print(f"  Product: {result.product_type}")
-                                print(f"  ArUco ID: {result.aruco_id}")
-                                print(f"  Status: {result.spoilage_level.value}")
-                                print(f"  Spoilage: {result.spoilage_percentage}%")
-                                print(f"  Safe: {'Yes' if result.is_safe else 'NO!'}")
-                                break
-                
-                if detection_cooldown > 0:
-                    detection_cooldown -= 1
-                    if last_result and last_aruco and last_region:
-                        # Keep showing last detection
-                        # Update aruco position if still visible
-                        current_aruco = None
-                        for aruco in aruco_results:
-                            if aruco['id'] == last_result.aruco_id:
-                                current_aruco = aruco
-                                break
-                        
-                        if current_aruco:
-                            region = self.find_indicator_region_from_aruco(frame, current_aruco['rect'])
-                            if region:
-                                qr_poly = qr_results[0]['polygon'] if qr_results else None
-                                display_frame = self.draw_detection_overlay(
-                                    display_frame, last_result, current_aruco['corners'], region, qr_poly
-                                )
+                # Print each new detection to the console (at most once per re-verification)
+                if last_result is not previous_result:
+                    print(f"\n[{last_result.timestamp}] Detection:")
+                    print(f"  Package: {last_result.package_id}")
+                    print(f"  Product: {last_result.product_type}")
+                    print(f"  ArUco ID: {last_result.aruco_id}")
+                    print(f"  Status: {last_result.spoilage_level.value}")
+                    print(f"  Spoilage: {last_result.spoilage_percentage}%")
+                    print(f"  Safe: {'Yes' if last_result.is_safe else 'NO!'}")
                 
                 # Add instructions overlay
                 cv2.putText(display_frame, "Point at VECNA label (ArUco + Indicator) | Q=Quit | S=Save", 
@@ -592,20 +1018,8 @@ class VECNASpoilageDetector:
                     # Save detection result
                     filename = f"detection_{last_result.package_id}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
                     with open(filename, 'w') as f:
-                        json.dump({
-                            'package_id': last_result.package_id,
-                            'product_type': last_result.product_type,
-                            'batch_id': last_result.batch_id,
-                            'pack_date': last_result.pack_date,
-                            'aruco_id': last_result.aruco_id,
-                            'spoilage_level': last_result.spoilage_level.value,
-                            'spoilage_percentage': last_result.spoilage_percentage,
-                            'confidence': last_result.confidence,
-                            'timestamp': last_result.timestamp,
-                            'color_readings': last_result.color_readings,
-                            'is_safe': last_result.is_safe,
-                            'recommendation': last_result.recommendation
-                        }, f, indent=2)
+                        json.dump(asdict(last_result), f, indent=2,
+                                  default=lambda o: o.value if isinstance(o, Enum) else str(o))
                     print(f"\n✅ Detection saved to {filename}")
                     
         finally:
@@ -654,6 +1068,145 @@ def detect_from_image(image_path: str) -> Optional[DetectionResult]:
     return result
 
 
+# ============================================================================
+# LIVE CAMERA STREAM
+# ============================================================================
+
+# Stream frames are for viewing only, so a lower JPEG quality is fine
+STREAM_JPEG_QUALITY = 75
+
+
+def load_turbojpeg():
+    """libjpeg-turbo encoder if PyTurboJPEG and the shared library are available."""
+    if TurboJPEG is None:
+        return None
+    try:
+        return TurboJPEG()
+    except (OSError, RuntimeError):
+        return None
+
+
+class CameraFeed:
+    """
+    Captures and annotates camera frames on a background thread for the MJPEG
+    stream. Only the newest frame is kept: viewers that fall behind skip
+    frames instead of backing up detection, and capture is paced to
+    target_fps so detection does not spin faster than it is viewed. The
+    thread stops and releases the camera when the last viewer disconnects.
+    """
+    
+    def __init__(self, camera_id: int = 0, target_fps: float = 15):
+        self.detector = VECNASpoilageDetector(camera_id=camera_id)
+        self.target_fps = target_fps
+        self.running = False
+        self._viewers = 0  # Open mjpeg() streams
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._jpeg = None  # Newest frame, JPEG-encoded once for every viewer
+        self._frame_id = 0
+        self._cond = threading.Condition()
+        self._turbojpeg = load_turbojpeg()
+    
+    def start(self) -> bool:
+        """Open the camera and start the capture thread (no-op if already running)."""
+        with self._start_lock:
+            if self.running:
+                return True
+            # A feed stopped by its last viewer may still be holding the camera
+            if self._thread is not None:
+                self._thread.join()
+            if not self.detector.start_camera():
+                return False
+            with self._cond:
+                self.running = True
+            self._thread = threading.Thread(target=self._run, name='camera-feed', daemon=True)
+            self._thread.start()
+        return True
+    
+    def _run(self):
+        interval = 1.0 / self.target_fps
+        try:
+            while self.running:
+                started = time.monotonic()
+                ret, frame = self.detector.cap.read()
+                if not ret:
+                    print("Error: Could not read frame")
+                    break
+                
+                jpeg = self.encode_jpeg(self.detector.annotate_frame(frame))
+                if jpeg is not None:
+                    with self._cond:
+                        self._jpeg = jpeg
+                        self._frame_id += 1
+                        self._cond.notify_all()
+                
+                time.sleep(max(0.0, interval - (time.monotonic() - started)))
+        finally:
+            self.detector.cap.release()
+            with self._cond:
+                self.running = False
+                self._cond.notify_all()
+    
+    def encode_jpeg(self, frame: np.ndarray) -> Optional[bytes]:
+        """JPEG-encode a display frame with libjpeg-turbo when available."""
+        if self._turbojpeg is not None:
+            return self._turbojpeg.encode(frame, quality=STREAM_JPEG_QUALITY, pixel_format=TJPF_BGR)
+        ok, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, STREAM_JPEG_QUALITY])
+        return buffer.tobytes() if ok else None
+    
+    def wait_frame(self, last_id: int, timeout: float = 1.0) -> Tuple[int, Optional[bytes]]:
+        """Wait for a frame newer than last_id; returns (frame_id, jpeg)."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._frame_id != last_id or not self.running, timeout)
+            return self._frame_id, self._jpeg
+    
+    def mjpeg(self):
+        """
+        Yield multipart JPEG parts for as long as the camera runs. Capture
+        stops once the last viewer's stream is closed.
+        """
+        with self._cond:
+            self._viewers += 1
+        try:
+            # The last viewer may have stopped the feed since the route started it
+            if not self.start():
+                return
+            frame_id = 0
+            while self.running:
+                new_id, jpeg = self.wait_frame(frame_id)
+                if new_id == frame_id or jpeg is None:
+                    continue
+                frame_id = new_id
+                yield b'--frame\r\nContent-Type: image/jpeg\r\n\r\n' + jpeg + b'\r\n'
+        finally:
+            with self._cond:
+                self._viewers -= 1
+                if self._viewers == 0:
+                    self.running = False
+                    self._cond.notify_all()
+
+
+camera_feed = None  # Created on the first stream request
+camera_feed_lock = threading.Lock()
+
+api_detectors = queue.SimpleQueue()  # Idle detectors reused by /api/detect
+
+
+def get_detector() -> VECNASpoilageDetector:
+    """
+    Take an idle detector for one /api/detect request, building a new one
+    only when all of them are busy (detectors keep per-frame state, so
+    concurrent requests must not share one). Put it back in api_detectors
+    when done.
+    """
+    try:
+        detector = api_detectors.get_nowait()
+    except queue.Empty:
+        return VECNASpoilageDetector()
+    detector.reset_tracking()
+    return detector
+
+
 # ============================================================================
 # WEB INTERFACE ROUTES
 # ============================================================================
@@ -664,100 +1217,151 @@ def detector_page():
     return render_template('detector.html')
 
 
+@app.route('/api/camera/stream')
+def camera_stream():
+    """MJPEG stream of the server-attached camera with the detection overlay."""
+    global camera_feed
+    with camera_feed_lock:
+        if camera_feed is None:
+            camera_feed = CameraFeed(camera_id=app.config.get('CAMERA_ID', 0))
+        if not camera_feed.start():
+            return jsonify({'success': False, 'error': 'Could not open camera'}), 503
+    
+    return Response(camera_feed.mjpeg(), mimetype='multipart/x-mixed-replace; boundary=frame')
+
+
+# Quality of the /api/detect result image (OpenCV's JPEG default is 95)
+RESULT_JPEG_QUALITY = int(os.environ.get('VECNA_JPEG_QUALITY', 80))
+RESULT_WEBP_QUALITY = 75
+
+# Responses to recent uploads, so a client resending the same still frame
+# skips detection: (image digest, no_image, webp) -> (payload, image)
+RESULT_CACHE_SIZE = 128
+result_cache = OrderedDict()
+result_cache_lock = threading.Lock()
+
+
+def encode_result_image(frame: Optional[np.ndarray]) -> Optional[Tuple[str, bytes]]:
+    """
+    Encode the /api/detect result frame as (mimetype, bytes): JPEG, or WebP
+    for clients that list image/webp in their Accept header (several times
+    smaller, but much slower to encode). None when there is no frame.
+    """
+    if frame is None:
+        return None
+    if 'image/webp' in request.headers.get('Accept', ''):
+        _, image = cv2.imencode('.webp', frame, [cv2.IMWRITE_WEBP_QUALITY, RESULT_WEBP_QUALITY])
+        return 'image/webp', image.tobytes()
+    _, image = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, RESULT_JPEG_QUALITY])
+    return 'image/jpeg', image.tobytes()
+
+
+def detection_response(payload: dict, image: Optional[Tuple[str, bytes]]) -> Response:
+    """
+    Build the /api/detect response. By default the image is embedded in the
+    JSON as a base64 data URL; with ?binary=1 the body is the raw image and
+    the JSON goes in the X-Detection header, which skips the base64 encoding
+    and its 33% size overhead. Without an image (?no_image=1) result_image
+    is null. payload is not modified, so cached payloads can be reused.
+    """
+    if image is None:
+        return jsonify(dict(payload, result_image=None))
+    
+    mimetype, data = image
+    if request.args.get('binary') == '1':
+        response = Response(data, mimetype=mimetype)
+        response.headers['X-Detection'] = json.dumps(payload)  # ASCII-escaped, safe for a header
+        return response
+    
+    result_image = f'data:{mimetype};base64,' + base64.b64encode(data).decode('utf-8')
+    return jsonify(dict(payload, result_image=result_image))
+
+
+def detection_payload(detector: VECNASpoilageDetector, frame: np.ndarray, want_image: bool) -> Tuple[dict, Optional[Tuple[str, bytes]]]:
+    """Run detection on an uploaded frame; returns the response payload and encoded result image."""
+    # Perform detection (a result always comes with its ArUco marker)
+    output = detector.analyze_frame(frame)
+    result = output.result
+    
+    # ?no_image=1: JSON only, skip drawing and encoding the result image
+    if not want_image:
+        frame = None
+    
+    if not result:
+        # No detection - still return the image
+        return {
+            'success': False,
+            'error': 'No VECNA label detected. Ensure ArUco marker is visible.'
+        }, encode_result_image(frame)
+    
+    # Draw overlay with the markers found during detection
+    qr_results = output.qr_results
+    
+    if frame is not None and output.aruco:
+        qr_poly = qr_results[0]['polygon'] if qr_results else None
+        frame = detector.draw_detection_overlay(frame, result, output.aruco['corners'], output.region, qr_poly)
+    
+    return {
+        'success': True,
+        'result': {
+            'package_id': result.package_id,
+            'product_type': result.product_type,
+            'batch_id': result.batch_id,
+            'pack_date': result.pack_date,
+            'aruco_id': result.aruco_id,
+            'spoilage_level': result.spoilage_level.value,
+            'spoilage_percentage': result.spoilage_percentage,
+            'confidence': result.confidence,
+            'is_safe': result.is_safe,
+            'recommendation': result.recommendation,
+            'color_readings': result.color_readings
+        }
+    }, encode_result_image(frame)
+
+
 @app.route('/api/detect', methods=['POST'])
 def api_detect():
     """API endpoint to detect spoilage from uploaded image."""
     try:
-        detector = VECNASpoilageDetector()
-        
         # Check if image is uploaded as file or base64
         if 'image' in request.files:
-            file = request.files['image']
-            # Read image from file
-            file_bytes = np.frombuffer(file.read(), np.uint8)
-            frame = cv2.imdecode(file_bytes, cv2.IMREAD_COLOR)
+            img_bytes = request.files['image'].read()
         elif request.json and 'image' in request.json:
             # Base64 encoded image (from webcam)
             image_data = request.json['image']
-            # Remove data URL prefix if present
-            if ',' in image_data:
-                image_data = image_data.split(',')[1]
-            # Decode base64
-            img_bytes = base64.b64decode(image_data)
-            nparr = np.frombuffer(img_bytes, np.uint8)
-            frame = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+            # Remove data URL prefix if present (one copy, unlike split)
+            image_data = image_data.partition(',')[2] or image_data
+            img_bytes = binascii.a2b_base64(image_data)
         else:
             return jsonify({'success': False, 'error': 'No image provided'}), 400
         
+        want_image = request.args.get('no_image') != '1'
+        key = (hashlib.blake2b(img_bytes, digest_size=16).digest(), want_image,
+               'image/webp' in request.headers.get('Accept', ''))
+        with result_cache_lock:
+            cached = result_cache.get(key)
+            if cached is not None:
+                result_cache.move_to_end(key)
+        if cached is not None:
+            return detection_response(*cached)
+        
+        # Decode straight from the uploaded bytes (np.frombuffer doesn't copy)
+        frame = cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_COLOR)
         if frame is None:
             return jsonify({'success': False, 'error': 'Could not decode image'}), 400
         
-        # Perform detection (handles both QR-only and ArUco+visual)
-        result = detector.detect_from_frame(frame)
+        detector = get_detector()
+        try:
+            payload, image = detection_payload(detector, frame, want_image)
+        finally:
+            api_detectors.put(detector)
         
-        if result:
-            # Draw overlay on image if we have ArUco markers
-            aruco_results = detector.detect_aruco_markers(frame)
-            qr_results = detector.decode_qr_codes(frame)
-            
-            if aruco_results:
-                aruco = aruco_results[0]
-                region = detector.find_indicator_region_from_aruco(frame, aruco['rect'])
-                if region:
-                    qr_poly = qr_results[0]['polygon'] if qr_results else None
-                    frame = detector.draw_detection_overlay(frame, result, aruco['corners'], region, qr_poly)
-            elif qr_results:
-                # QR-only detection - draw simple overlay
-                qr_poly = qr_results[0]['polygon']
-                cv2.polylines(frame, [qr_poly], True, (0, 255, 0), 3)
-                
-                # Draw status panel
-                panel_height = 150
-                panel = np.zeros((panel_height, frame.shape[1], 3), dtype=np.uint8)
-                panel[:] = (40, 40, 40)
-                
-                status_color = (0, 255, 0) if result.is_safe else (0, 0, 255)
-                cv2.circle(panel, (50, 50), 30, status_color, -1)
-                cv2.putText(panel, f"Package: {result.package_id}", (100, 30), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-                cv2.putText(panel, f"Status: {result.spoilage_level.value} (QR Verified)", (100, 60), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.7, status_color, 2)
-                cv2.putText(panel, result.recommendation[:70], (20, 110), 
-                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, status_color, 1)
-                
-                frame = np.vstack([frame, panel])
-            
-            # Encode result image to base64
-            _, buffer = cv2.imencode('.jpg', frame)
-            result_image = base64.b64encode(buffer).decode('utf-8')
-            
-            return jsonify({
-                'success': True,
-                'result': {
-                    'package_id': result.package_id,
-                    'product_type': result.product_type,
-                    'batch_id': result.batch_id,
-                    'pack_date': result.pack_date,
-                    'aruco_id': result.aruco_id,
-                    'spoilage_level': result.spoilage_level.value,
-                    'spoilage_percentage': result.spoilage_percentage,
-                    'confidence': result.confidence,
-                    'is_safe': result.is_safe,
-                    'recommendation': result.recommendation,
-                    'color_readings': result.color_readings
-                },
-                'result_image': f'data:image/jpeg;base64,{result_image}'
-            })
-        else:
-            # No detection - still return the image
-            _, buffer = cv2.imencode('.jpg', frame)
-            result_image = base64.b64encode(buffer).decode('utf-8')
-            
-            return jsonify({
-                'success': False,
-                'error': 'No VECNA label detected. Ensure ArUco marker is visible.',
-                'result_image': f'data:image/jpeg;base64,{result_image}'
-            })
+        with result_cache_lock:
+            result_cache[key] = (payload, image)
+            if len(result_cache) > RESULT_CACHE_SIZE:
+                result_cache.popitem(last=False)
+        
+        return detection_response(payload, image)
             
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -773,7 +1377,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='VECNA Spoilage Detector')
     parser.add_argument('--image', '-i', type=str, help='Path to image file for detection')
     parser.add_argument('--camera', '-c', type=int, default=0, help='Camera ID (default: 0)')
-    parser.add_argument('--debug', '-d', action='store_true', help='Enable debug mode')
+    parser.add_argument('--debug', '-d', action='store_true', help='Enable debug mode (also the Flask debugger/reloader with --web)')
     parser.add_argument('--web', '-w', action='store_true', help='Run web interface')
     parser.add_argument('--port', '-p', type=int, default=5002, help='Web server port (default: 5002)')
     
@@ -785,8 +1389,11 @@ if __name__ == '__main__':
         print("  VECNA Spoilage Detector - Web Interface")
         print("="*60)
         print(f"\n  Detector: http://localhost:{args.port}/detector")
+        print(f"  Camera stream: http://localhost:{args.port}/api/camera/stream")
         print("="*60 + "\n")
-        app.run(debug=True, host='0.0.0.0', port=args.port)
+        app.config['CAMERA_ID'] = args.camera
+        # Development server only; use gunicorn for production (see wsgi.py)
+        app.run(debug=args.debug, host='0.0.0.0', port=args.port, threaded=True)
     elif args.image:
         # Static image detection
         detect_from_image(args.image)
@@ -0,0 +1,72 @@
+"""Tests for batch telemetry ingestion (/api/v1/telemetry/batch)."""
+import os
+import sys
+import tempfile
+
+import pytest
+
+# app.py reads DATABASE_URL at import time
+_db_dir = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_db_dir, 'test.db')
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import app, db, init_db, Trip, TelemetryFrame  # noqa: E402
+
+
+def make_frame(timestamp, temp_c=3.5, trip_id='TRIP-BATCH-TEST'):
+    return {
+        'gateway_id': 'TRUCK-BATCH',
+        'trip_id': trip_id,
+        'timestamp': timestamp,
+        'location': {'lat': 13.0827, 'lng': 80.2707, 'speed_kmh': 50},
+        'cargo_sensors': [
+            {'node_id': 'BOX-A01', 'product_type': 'Dairy', 'temp_c': temp_c, 'battery_pct': 90}
+        ]
+    }
+
+
+@pytest.fixture()
+def client():
+    init_db()
+    yield app.test_client()
+    with app.app_context():
+        db.drop_all()
+
+
+def test_batch_ingests_all_frames(client):
+    frames = [make_frame(f'2026-01-16T14:3{i}:00Z') for i in range(3)]
+    response = client.post('/api/v1/telemetry/batch', json={'frames': frames})
+    
+    assert response.status_code == 201
+    data = response.get_json()['data']
+    assert data['frames_ingested'] == 3
+    assert len(data['frame_ids']) == 3
+
+
+def test_batch_rejects_invalid_frame(client):
+    frames = [make_frame('2026-01-16T14:30:00Z'), make_frame('not-a-timestamp')]
+    response = client.post('/api/v1/telemetry/batch', json={'frames': frames})
+    
+    assert response.status_code == 400
+    assert response.get_json()['error'].startswith('Frame 1:')
+
+
+def test_batch_mixes_offset_and_naive_timestamps(client):
+    frames = [
+        make_frame('2026-01-16T14:30:00Z'),
+        make_frame('2026-01-16T14:31:00'),
+        make_frame('2026-01-16T20:02:00+05:30'),  # 14:32 UTC, the newest frame
+        make_frame('2026-01-16T14:29:00+00:00'),
+    ]
+    response = client.post('/api/v1/telemetry/batch', json={'frames': frames})
+    
+    assert response.status_code == 201
+    frame_ids = response.get_json()['data']['frame_ids']
+    with app.app_context():
+        trip = Trip.query.filter_by(trip_id='TRIP-BATCH-TEST').one()
+        assert trip.total_frames == 4
+        assert trip.latest_frame_id == frame_ids[2]
+        
+        # Offset timestamps are stored as naive UTC
+        newest = db.session.get(TelemetryFrame, frame_ids[2])
+        assert newest.timestamp.isoformat() == '2026-01-16T14:32:00'
@@ -22,3 +22,5 @@ if __name__ == '__main__':
         seed_demo_data()
     
     print("VECNA startup complete. Ready for gunicorn.")
+    print("  Dashboard/API:     gunicorn --bind 0.0.0.0:5000 --workers 2 --threads 4 app:app")
+    print("  Spoilage detector: gunicorn --bind 0.0.0.0:5002 --worker-class gthread --workers 1 --threads 8 spoilage_detector:app")